@@ -0,0 +1,392 @@
+"""
+Offline render benchmark for customhelp.
+
+Builds a fake bot with N cogs x M commands spread over K categories, a stub
+Context/channel, and times the help formatters of every theme in
+customhelp/themes along with make_embeds and HybridMenus navigation.
+
+Usage (from the repo root, needs Red-DiscordBot and the customhelp requirements):
+
+    python benchmarks/customhelp_bench.py --cogs 90 --commands 15 --categories 20
+
+Permission checks are not benchmarked (verify_checks is off), they need a live bot.
+The line/page caches are warm after the first iteration, use --cold to clear them
+before every call.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import MethodType
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import discord  # noqa: E402
+from redbot.core import commands  # noqa: E402
+from redbot.core.commands.help import HelpMenuSetting, HelpSettings  # noqa: E402
+
+from customhelp import themes  # noqa: E402
+from customhelp.core import (  # noqa: E402
+    ARROWS,
+    COMMAND_INDEX,
+    GLOBAL_CATEGORIES,
+    HELP_CACHE,
+    LINE_CACHE,
+    PERMISSION_RULES,
+    SEARCH_INDEX,
+)
+from customhelp.core.base_help import BaguetteHelp, EmbedField, HybridMenus  # noqa: E402
+from customhelp.core.category import Arrow, Category  # noqa: E402
+
+FEATURES = {
+    "category": "format_category_help",
+    "main": "format_bot_help",
+    "cog": "format_cog_help",
+    "command": "format_command_help",
+}
+SETTINGS = {
+    "nav": True,
+    "set_formatter": True,
+    "thumbnail": None,
+    "timeout": 120,
+    "replies": False,
+    "menutype": "select",  # category buttons hit the 25 components limit with many categories
+    "arrowtype": "buttons",
+    "deletemessage": False,
+    "persistent": False,
+}
+ARROW_EMOJIS = {
+    "force_left": "⏮️",
+    "left": "⬅️",
+    "cross": "❌",
+    "right": "➡️",
+    "force_right": "⏭️",
+    "home": "🏘️",
+}
+
+
+# Stubs
+class StubAvatar:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+
+class StubMember:
+    def __init__(self, id, name):
+        self.id = id
+        self.name = self.display_name = name
+        self.display_avatar = StubAvatar()
+        self.roles = []
+        self.bot = False
+
+
+class StubPermissions:
+    manage_messages = False
+    add_reactions = True
+    value = 0
+
+
+class StubMessage(discord.Message):
+    # Subclassed for the isinstance checks in HybridMenus, none of the slots are set
+    id = 1
+
+    def __init__(self):
+        pass
+
+    async def edit(self, **kwargs):
+        return self
+
+    async def delete(self):
+        pass
+
+    def to_reference(self, **kwargs):
+        return None
+
+
+class StubChannel:
+    id = 1
+
+    def permissions_for(self, member):
+        return StubPermissions()
+
+    def is_nsfw(self):
+        return False
+
+    async def send(self, *args, **kwargs):
+        return StubMessage()
+
+
+class StubResponse:
+    async def edit_message(self, **kwargs):
+        pass
+
+    async def defer(self):
+        pass
+
+
+class StubInteraction:
+    def __init__(self):
+        self.response = StubResponse()
+
+    async def edit_original_response(self, **kwargs):
+        pass
+
+
+class StubHelpConfig:
+    async def all(self):
+        return {"use_menus": HelpMenuSetting.buttons.value, "verify_checks": False}
+
+
+class StubConfig:
+    help = StubHelpConfig()
+
+
+class FakeBot:
+    def __init__(self, cogs):
+        self.cogs = {cog.qualified_name: cog for cog in cogs}
+        self.all_commands = {}
+        for cog in cogs:
+            # Same as Cog._inject
+            for command in cog.__cog_commands__:
+                command.cog = cog
+                if command.parent is None:
+                    self.all_commands[command.name] = command
+        self.owner_ids = {1}
+        self.description = "A fake bot for benchmarking the help"
+        self._config = StubConfig()
+        self._help_formatter = None
+
+    @property
+    def commands(self):
+        return set(self.all_commands.values())
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    def get_emoji(self, emoji_id):
+        return None
+
+    def walk_commands(self):
+        for command in self.commands:
+            yield command
+            if isinstance(command, commands.Group):
+                yield from command.walk_commands()
+
+    async def is_owner(self, user):
+        return user.id in self.owner_ids
+
+
+class StubContext:
+    def __init__(self, bot):
+        self.bot = bot
+        self.author = StubMember(2, "member")
+        self.me = StubMember(3, "benchbot")
+        self.guild = None
+        self.channel = StubChannel()
+        self.message = StubMessage()
+        self.clean_prefix = "!"
+        self.prefix = "!"
+        self.invoked_with = "help"
+
+    async def embed_requested(self):
+        return True
+
+    async def embed_color(self):
+        return discord.Color.red()
+
+    async def send(self, *args, **kwargs):
+        return StubMessage()
+
+    async def reply(self, *args, **kwargs):
+        return StubMessage()
+
+    async def tick(self):
+        pass
+
+
+# Synthetic bot
+def make_cog(index: int, n_commands: int) -> commands.Cog:
+    attrs = {"__doc__": f"Synthetic cog number {index}, used for benchmarking."}
+    for number in range(n_commands):
+        name = f"c{index}cmd{number}"
+
+        async def callback(self, ctx):
+            pass
+
+        callback.__name__ = name
+        doc = (
+            f"Does the thing number {number} of cog {index} with `[p]{name}`.\n\n"
+            "A longer description that only shows up in the command help. " * 3
+        )
+        if number % 5 == 0:
+            group = commands.group(name=name, help=doc)(callback)
+            for sub_number in range(4):
+
+                async def sub_callback(self, ctx):
+                    pass
+
+                sub_name = f"sub{sub_number}"
+                sub_callback.__name__ = f"{name}_{sub_name}"
+                group.command(name=sub_name, help=f"Subcommand {sub_number} of {name}.")(
+                    sub_callback
+                )
+            attrs[name] = group
+        else:
+            attrs[name] = commands.command(name=name, aliases=[f"{name}a"], help=doc)(callback)
+    return type(f"BenchCog{index}", (commands.Cog,), attrs)()
+
+
+def populate_globals(cogs, n_categories: int):
+    GLOBAL_CATEGORIES.clear()
+    buckets = [[] for _ in range(n_categories)]
+    for index, cog in enumerate(cogs):
+        buckets[index % n_categories].append(cog.qualified_name)
+    for number, cogs_in_category in enumerate(buckets):
+        GLOBAL_CATEGORIES.append(
+            Category(
+                name=f"category{number}",
+                desc=f"Category number {number}",
+                cogs=cogs_in_category,
+                reaction="🔹",
+                label=f"category{number}",
+            )
+        )
+    GLOBAL_CATEGORIES.append(
+        Category(name="uncategorised", desc="Miscellaneous cogs", cogs=[], is_uncat=True)
+    )
+    GLOBAL_CATEGORIES.reindex()
+
+    ARROWS.clear()
+    for name, emoji in ARROW_EMOJIS.items():
+        ARROWS.append(Arrow(name=name, emoji=emoji, label="", style=discord.ButtonStyle.primary))
+
+
+def make_formatter(bot, theme_name: str) -> BaguetteHelp:
+    """Loads every feature of the theme, same as `[p]chelp load <theme> all`"""
+    formatter = BaguetteHelp(bot, dict(SETTINGS), {"nsfw": [], "dev": []})
+    theme = themes.list[theme_name]
+    for method_name in FEATURES.values():
+        if hasattr(theme, method_name):
+            setattr(formatter, method_name, MethodType(getattr(theme, method_name), formatter))
+    return formatter
+
+
+# Measuring
+def clear_caches():
+    HELP_CACHE.clear()
+    LINE_CACHE.clear()
+    COMMAND_INDEX.invalidate()
+    SEARCH_INDEX.invalidate()
+    PERMISSION_RULES.invalidate()
+
+
+async def measure(coro_factory, iterations: int, cold: bool):
+    timings = []
+    for _ in range(iterations):
+        if cold:
+            clear_caches()
+        start = time.perf_counter()
+        await coro_factory()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Separate pass, tracemalloc slows everything down
+    if cold:
+        clear_caches()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    await coro_factory()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if len(timings) > 1:
+        quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+        p50, p99 = quantiles[49], quantiles[98]
+    else:
+        p50 = p99 = timings[0]
+    return p50, p99, (peak - before) / 1024
+
+
+async def bench_theme(bot, theme_name: str, help_settings, args):
+    formatter = make_formatter(bot, theme_name)
+    bot._help_formatter = formatter
+    ctx = StubContext(bot)
+
+    category = max(GLOBAL_CATEGORIES, key=lambda cat: len(cat.cogs))
+    cog = next(iter(bot.cogs.values()))
+    group = next(c for c in cog.get_commands() if isinstance(c, commands.Group))
+
+    emb = await formatter.embed_template(help_settings, ctx, bot.description)
+    for number in range(60):
+        emb["fields"].append(EmbedField(f"Field {number}", "value " * 80, False))
+
+    # make_embeds builds the pages lazily
+    async def first_page():
+        (await formatter.make_embeds(ctx, emb, help_settings))[0]
+
+    async def all_pages():
+        list(await formatter.make_embeds(ctx, emb, help_settings))
+
+    async def navigation():
+        page_mapping = {
+            cat: None for cat in await formatter.filter_categories(ctx, GLOBAL_CATEGORIES)
+        }
+        home = await formatter.format_bot_help(ctx, help_settings, get_pages=True)
+        menu = HybridMenus(formatter.settings, help_settings, page_mapping, home)
+        await menu.start(ctx)
+        interaction = StubInteraction()
+        await menu.category_react_action(ctx, interaction, category.name)
+        for _ in range(3):
+            await menu.next_page(interaction)
+        await menu.prev_page(interaction)
+        await menu.home_page(ctx, interaction)
+
+    benchmarks = {
+        "format_bot_help": lambda: formatter.format_bot_help(ctx, help_settings),
+        "format_category_help": lambda: formatter.format_category_help(
+            ctx, category, help_settings
+        ),
+        "format_cog_help": lambda: formatter.format_cog_help(ctx, cog, help_settings),
+        "format_command_help": lambda: formatter.format_command_help(ctx, group, help_settings),
+        "make_embeds (first page)": lambda: first_page(),
+        "make_embeds (all pages)": lambda: all_pages(),
+        "send_help (cached)": lambda: formatter.send_help(ctx, category),
+        "help search": lambda: formatter.send_help(ctx, "search thing number 7 cog"),
+        "HybridMenus navigation": navigation,
+    }
+    results = []
+    for name, coro_factory in benchmarks.items():
+        results.append((name, *await measure(coro_factory, args.iterations, args.cold)))
+    return results
+
+
+async def main(args):
+    cogs = [make_cog(index, args.commands) for index in range(args.cogs)]
+    bot = FakeBot(cogs)
+    populate_globals(cogs, args.categories)
+    help_settings = HelpSettings(
+        use_menus=HelpMenuSetting.buttons, verify_checks=False, max_pages_in_guild=100
+    )
+
+    selected = args.themes.split(",") if args.themes else sorted(themes.list)
+    print(
+        f"{args.cogs} cogs x {args.commands} commands, {args.categories} categories, "
+        f"{args.iterations} iterations{' (cold caches)' if args.cold else ''}\n"
+    )
+    print(f"{'theme':<10} {'operation':<24} {'p50 ms':>9} {'p99 ms':>9} {'peak KiB':>10}")
+    for theme_name in selected:
+        for name, p50, p99, peak in await bench_theme(bot, theme_name, help_settings, args):
+            print(f"{theme_name:<10} {name:<24} {p50:>9.3f} {p99:>9.3f} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--cogs", type=int, default=90)
+    parser.add_argument("--commands", type=int, default=15, help="Commands per cog")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--themes", default="", help="Comma separated, all themes by default")
+    parser.add_argument("--cold", action="store_true", help="Clear the caches before every call")
+    asyncio.run(main(parser.parse_args()))
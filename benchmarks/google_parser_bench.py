@@ -0,0 +1,112 @@
+"""
+Benchmark of the google cog's results page parsing backends.
+
+Parses saved results pages with every installed backend (selectolax, BeautifulSoup with lxml,
+BeautifulSoup with html.parser), the streamed extraction and the old BeautifulSoup html.parser
+scraper, and checks they extract the same results. The streamed one scans the page and parses it
+up to the 10th result, plus the rhs column, with the fastest backend. It should match the first
+10 results and the cards of the full page, its real gain is the part of the page that isn't
+downloaded, which this doesn't measure.
+
+Usage (from the repo root, needs the google cog requirements, lxml/selectolax are optional):
+
+    python benchmarks/google_parser_bench.py --repeat 20 [saved.html ...]
+
+The pages in benchmarks/fixtures are used when no file is given, google_serp_rhs.html has a
+knowledge panel in the rhs column after the results. `[p]google debug <url>` saves real pages.
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from html2text import html2text as h2t  # noqa: E402
+
+from google.parser import BACKENDS, ResultScanner, extract  # noqa: E402
+from google.utils import get_card, s  # noqa: E402
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures").glob("google_serp*.html"))
+RESULTS_LIMIT = 10
+
+
+def old_parser_text(text, cards=True):
+    """Google.parser_text before the backends"""
+    soup = BeautifulSoup(text, features="html.parser")
+    final = []
+    kwargs = {"stats": h2t(str(soup.find("div", id="result-stats")))}
+    if cards:
+        get_card(soup, final, kwargs)
+    for res in soup.select("div.g.tF2Cxc"):
+        if name := res.find("div", class_="yuRUbf"):
+            url = name.a["href"]
+            if title := name.find("h3", class_=re.compile("LC20lb")):
+                title = title.text
+            else:
+                title = url
+        else:
+            url = None
+            title = None
+        if desc := res.select_one("div.Z26q7c>div.VwiC3b"):
+            desc = h2t(desc.text)[:500]
+        else:
+            desc = "Not found"
+        if title:
+            final.append(s(url, title, desc.replace("\n", " ")))
+    return final, kwargs
+
+
+def first_results(parsed, limit=RESULTS_LIMIT):
+    """The cards and the first results of an extraction"""
+    results, kwargs = parsed
+    cards = [result for result in results if result.url is None]
+    return cards + [result for result in results if result.url][:limit], kwargs
+
+
+def streamed(text, cards=True, chunk_size=16384, limit=RESULTS_LIMIT):
+    """What Google.stream_results does with the page, the download left aside"""
+    scanner = ResultScanner(limit)
+    for start in range(0, len(text), chunk_size):
+        scanner.feed(text[start : start + chunk_size])
+        if scanner.done:
+            break
+    return extract(scanner.page(), cards=cards)
+
+
+def main(args):
+    for path in args.files or FIXTURES:
+        text = Path(path).read_text(encoding="utf-8")
+        cards = not args.no_cards
+        expected = old_parser_text(text, cards)
+        print(f"{path} ({len(text) // 1024} KiB, {len(expected[0])} results)\n")
+        print(f"{'backend':<36} {'best ms':>9} {'mean ms':>9}  same output")
+        runs = [("old scraper (html.parser)", lambda text: old_parser_text(text, cards), expected)]
+        runs += [
+            (backend.name, lambda text, b=backend: extract(text, b, cards=cards), expected)
+            for backend in BACKENDS.values()
+        ]
+        runs.append(
+            (
+                "streamed, up to 10 results",
+                lambda text: streamed(text, cards),
+                first_results(expected),
+            )
+        )
+        for name, func, output in runs:
+            timings = timeit.repeat(lambda: func(text), number=1, repeat=args.repeat)
+            best = min(timings) * 1000
+            mean = sum(timings) / len(timings) * 1000
+            print(f"{name:<36} {best:>9.2f} {mean:>9.2f}  {func(text) == output}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("files", nargs="*", help="Saved results pages")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-cards", action="store_true", help="Only the results, like reverse")
+    main(parser.parse_args())
@@ -0,0 +1,74 @@
+"""
+Micro-benchmark of the embed paginator.
+
+Compares the old chain, "\\n".join of the command lines -> pagify(page_length=500) into fields
+-> RedHelpFormatter.group_embed_fields, with chunk_lines -> pack_fields from
+customhelp/core/paginator.py (also shipped as bible/paginator.py).
+
+Usage (from the repo root, needs Red-DiscordBot):
+
+    python benchmarks/paginator_bench.py --lines 1500 --repeat 200
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from redbot.core.commands.help import EmbedField, RedHelpFormatter  # noqa: E402
+from redbot.core.utils.chat_formatting import pagify  # noqa: E402
+
+from customhelp.core.paginator import chunk_lines, pack_fields  # noqa: E402
+
+
+def make_lines(count: int):
+    random.seed(0)
+    return [
+        f"`command{number:<10}:`" + "some short doc " * random.randint(0, 4)
+        for number in range(count)
+    ]
+
+
+def old_chain(lines, page_char_limit):
+    fields = [
+        EmbedField("title", page, False)
+        for page in pagify("\n".join(lines), page_length=500, shorten_by=0)
+    ]
+    return RedHelpFormatter.group_embed_fields(fields, page_char_limit)
+
+
+def new_chain(lines, page_char_limit):
+    fields = [EmbedField("title", page, False) for page in chunk_lines(lines, 500)]
+    return list(pack_fields(fields, page_char_limit))
+
+
+def main(args):
+    lines = make_lines(args.lines)
+    old_pages = old_chain(lines, args.page_char_limit)
+    new_pages = new_chain(lines, args.page_char_limit)
+    print(
+        f"{args.lines} lines, page_char_limit {args.page_char_limit}: "
+        f"{len(old_pages)} pages before, {len(new_pages)} pages now\n"
+    )
+    print(f"{'chain':<28} {'best us':>10} {'mean us':>10}")
+    for name, func in (
+        ("join + pagify + group", old_chain),
+        ("chunk_lines + pack_fields", new_chain),
+    ):
+        timings = timeit.repeat(
+            lambda: func(lines, args.page_char_limit), number=1, repeat=args.repeat
+        )
+        best = min(timings) * 1e6
+        mean = sum(timings) / len(timings) * 1e6
+        print(f"{name:<28} {best:>10.1f} {mean:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--lines", type=int, default=1500, help="Command lines to paginate")
+    parser.add_argument("--page-char-limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    main(parser.parse_args())
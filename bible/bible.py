@@ -1,3 +1,4 @@
+import asyncio
 import re
 
 import aiohttp
@@ -9,7 +10,9 @@ from redbot.core.bot import Red
 from redbot.core.utils.chat_formatting import pagify
 from redbot.vendored.discord.ext import menus
 
-from .utils import EmbedField, group_embed_fields
+from .http_client import close_session, make_session
+from .paginator import pack_fields
+from .utils import EmbedField
 
 
 class Bible(commands.Cog):
@@ -21,6 +24,13 @@ class Bible(commands.Cog):
         self.bot = bot
         self.BASE_URL = "https://www.biblegateway.com"
         self.ver_re = re.compile(r"--?(?:V|v|ver|version)(?:=| )(\w+)")
+        self.session: aiohttp.ClientSession = None
+
+    async def cog_load(self):
+        self.session = make_session()
+
+    async def cog_unload(self):
+        await close_session(self.session)
 
     def parse_search(self, text, title, version, emb_color):
         fields = []
@@ -39,7 +49,7 @@ class Bible(commands.Cog):
                 )
             )
 
-        raw = group_embed_fields(fields)
+        raw = list(pack_fields(fields))
         size = len(raw)
         for i, group in enumerate(raw, 1):
             emb = discord.Embed(title="Search Results for " + title, colour=emb_color)
@@ -109,39 +119,39 @@ class Bible(commands.Cog):
             url = "/quicksearch/?quicksearch="
 
         async with ctx.typing():
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
+            try:
+                async with self.session.get(
                     self.BASE_URL + url + query + f"&version={version}"
                 ) as resp:
                     soup = bs4.BeautifulSoup(await resp.text(), "html.parser")
+            except asyncio.TimeoutError:
+                return await ctx.send("Operation timed out.")
+
+            # Reference search
+            if text := soup.find("div", {"class": "passage-text"}):
+                full_chap = soup.find("a", {"class": "full-chap-link"})
+                title = soup.find("div", {"class": "dropdown-display-text"}).text
+                pages = self.parse_reference(
+                    text,
+                    (self.BASE_URL + full_chap.get("href")) if full_chap else None,
+                    title,
+                    version,
+                    emb_color=await ctx.embed_color(),
+                )
+
+            # Word Search
+            elif text := soup.find("div", {"class": "search-result-list"}):
+                pages = self.parse_search(text, query, version, emb_color=await ctx.embed_color())
+            # No result checks
+            else:
+                return await ctx.send(
+                    "**No results found**\n"
+                    "1) Kindly make sure the verse exists\n"
+                    "2) Use the format of `book chapter:verse-range`"
+                )
 
-                # Reference search
-                if text := soup.find("div", {"class": "passage-text"}):
-                    full_chap = soup.find("a", {"class": "full-chap-link"})
-                    title = soup.find("div", {"class": "dropdown-display-text"}).text
-                    pages = self.parse_reference(
-                        text,
-                        (self.BASE_URL + full_chap.get("href")) if full_chap else None,
-                        title,
-                        version,
-                        emb_color=await ctx.embed_color(),
-                    )
-
-                # Word Search
-                elif text := soup.find("div", {"class": "search-result-list"}):
-                    pages = self.parse_search(
-                        text, query, version, emb_color=await ctx.embed_color()
-                    )
-                # No result checks
-                else:
-                    return await ctx.send(
-                        "**No results found**\n"
-                        "1) Kindly make sure the verse exists\n"
-                        "2) Use the format of `book chapter:verse-range`"
-                    )
-
-                menu = menus.MenuPages(Source(pages, per_page=1), clear_reactions_after=True)
-                await menu.start(ctx)
+            menu = menus.MenuPages(Source(pages, per_page=1), clear_reactions_after=True)
+            await menu.start(ctx)
 
     async def red_delete_data_for_user(self, *, requester, user_id: int) -> None:
         return
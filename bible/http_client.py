@@ -0,0 +1,51 @@
+# Pooled aiohttp session, the same file is shipped with the google cog (google/http_client.py).
+# One session is kept for the cog's lifetime, connections, TLS sessions and DNS lookups get reused.
+
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+try:
+    import brotli  # noqa: F401
+
+    HAS_BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+
+        HAS_BROTLI = True
+    except ImportError:
+        HAS_BROTLI = False
+
+# Open connections, in total and to a single host. Requests over the limit wait for a free one
+POOL_LIMIT = 50
+POOL_LIMIT_PER_HOST = 8
+# Seconds an idle connection is kept open for the next request
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+# No request should hang a command forever, sock_read is the longest wait between two chunks
+TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10, sock_read=20)
+# aiohttp only decodes brotli when brotli (or brotlicffi) is installed
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+
+def make_session(**kwargs) -> aiohttp.ClientSession:
+    """A pooled session, the kwargs go to ClientSession. Needs a running event loop"""
+    connector = aiohttp.TCPConnector(
+        limit=POOL_LIMIT,
+        limit_per_host=POOL_LIMIT_PER_HOST,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+    headers = {"Accept-Encoding": ACCEPT_ENCODING, **kwargs.pop("headers", {})}
+    kwargs.setdefault("timeout", TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, headers=headers, **kwargs)
+
+
+async def close_session(session: Optional[aiohttp.ClientSession]):
+    if session is None or session.closed:
+        return
+    await session.close()
+    # Lets the TLS connections finish closing, else aiohttp warns about unclosed transports
+    await asyncio.sleep(0.25)
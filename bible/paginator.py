@@ -0,0 +1,56 @@
+# Single pass embed pagination, the same file is shipped with customhelp (core/paginator.py).
+# Every string length is computed once, nothing gets joined or re-scanned to be split.
+
+from typing import Iterable, Iterator, List
+
+# https://discord.com/developers/docs/resources/message#embed-object-embed-limits
+EMBED_TOTAL_LIMIT = 6000
+FIELD_COUNT_LIMIT = 25
+FIELD_VALUE_LIMIT = 1024
+
+
+def chunk_lines(lines: Iterable[str], page_length: int = FIELD_VALUE_LIMIT) -> Iterator[str]:
+    """Joins the lines with newlines into chunks of at most page_length characters.
+    Same as pagify("\\n".join(lines)) but without building and re-scanning the whole text.
+    Lines longer than page_length are hard split, like pagify does without a delimiter."""
+    chunk: List[str] = []
+    size = -1  # No newline before the first line
+    for line in lines:
+        length = len(line)
+        if size + 1 + length > page_length and chunk:
+            yield "\n".join(chunk)
+            chunk, size = [], -1
+        while length > page_length:
+            yield line[:page_length]
+            line = line[page_length:]
+            length -= page_length
+        if line.strip():
+            chunk.append(line)
+            size += 1 + length
+    if chunk:
+        yield "\n".join(chunk)
+
+
+def pack_fields(
+    fields: Iterable, max_chars: int = 1000, reserved: int = 0, head: int = 2
+) -> Iterator[List]:
+    """Groups embed fields (anything with a name and a value) into pages, greedily by length.
+    Same grouping as RedHelpFormatter.group_embed_fields, one page at a time, but a page also
+    stays under Discord's 25 fields and 6000 characters (minus the reserved title, footer etc).
+    The first `head` fields always share the first page, the help puts its header there."""
+    page_limit = EMBED_TOTAL_LIMIT - reserved
+    group: List = []
+    count = 0
+    for i, field in enumerate(fields):
+        length = len(field.name) + len(field.value)
+        if group and (
+            len(group) >= FIELD_COUNT_LIMIT
+            or count + length > page_limit
+            or (i >= head and count + length >= max_chars)
+        ):
+            yield group
+            group, count = [], 0
+        group.append(field)
+        count += length
+    if group:
+        yield group
@@ -1,4 +1,11 @@
-from typing import TYPE_CHECKING, List
+import re
+from bisect import bisect_left
+from collections import Counter, OrderedDict, defaultdict
+from difflib import get_close_matches
+from itertools import chain
+from math import log
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Hashable, List, Optional, Tuple
 
 if TYPE_CHECKING:
     from customhelp.core.category import Arrow, Category
@@ -7,18 +14,22 @@ if TYPE_CHECKING:
 class ArrowManager:
     def __init__(self):
         self.arrows: List[Arrow] = []
+        self._names: Dict[str, Arrow] = {}
 
     def append(self, arrow):
         self.arrows.append(arrow)
+        # First one wins, same as the old linear scan
+        self._names.setdefault(arrow.name, arrow)
 
     def clear(self):
         self.arrows.clear()
+        self._names.clear()
 
     def __getitem__(self, name: str):
-        for arrow in self.arrows:
-            if arrow.name == name:
-                return arrow
-        raise RuntimeError(f"No arrow with name {name}")
+        try:
+            return self._names[name]
+        except KeyError:
+            raise RuntimeError(f"No arrow with name {name}") from None
 
     def __iter__(self):
         return iter(self.arrows)
@@ -27,26 +38,87 @@ class ArrowManager:
 class CategoryManager:
     def __init__(self) -> None:
         self._list: List[Category] = []
+        # Lookup indexes, kept in sync by append/clear/reindex
+        self._names: Dict[str, int] = {}  # category name -> index in _list
+        self._cogs: Dict[str, Category] = {}  # cog name -> category
+        self._uncat: Optional[Category] = None
 
     @property
     def uncategorised(self):
-        for category in self._list:
-            if category.is_uncat:
-                return category
-        raise RuntimeError("Uncategorised category not set!")
+        if self._uncat is None:
+            raise RuntimeError("Uncategorised category not set!")
+        return self._uncat
 
     def get(self, name):
         return self._list[self.index(name)]
 
+    def find(self, name) -> Optional["Category"]:
+        """Returns the category with the given name, None if not present"""
+        index = self._names.get(name)
+        return None if index is None else self._list[index]
+
+    def from_cog(self, cog_name) -> Optional["Category"]:
+        """Returns the category the cog is present in, None if not present"""
+        return self._cogs.get(cog_name)
+
+    def add_cog(self, category, cog_name):
+        category.add_cogs(cog_name)
+        self._cogs.setdefault(cog_name, category)
+
+    def remove_cog(self, cog_name):
+        """Drops an unloaded cog from the uncategorised category.
+        Categories from the config keep their cogs, so reloading a cog puts it back in place"""
+        category = self._cogs.get(cog_name)
+        if category is None or not category.is_uncat:
+            return
+        del self._cogs[cog_name]
+        category.remove_cogs(cog_name)
+
     # TODO remove redundant methods
     def clear(self):
         self._list.clear()
+        self._names.clear()
+        self._cogs.clear()
+        self._uncat = None
 
     def index(self, name):
-        return self._list.index(name)
+        try:
+            return self._names[name]
+        except KeyError:
+            raise ValueError(f"{name} is not a category") from None
 
     def append(self, value):
+        self._names.setdefault(value.name, len(self._list))
         self._list.append(value)
+        self._index_category(value)
+
+    def remove(self, name):
+        del self._list[self.index(name)]
+        self.reindex()
+
+    def move_to_front(self, indexes):
+        """Moves the categories at the given indexes to the front, in that order"""
+        indexes = list(dict.fromkeys(indexes))
+        front = set(indexes)
+        self._list[:] = [self._list[i] for i in indexes] + [
+            category for i, category in enumerate(self._list) if i not in front
+        ]
+        self.reindex()
+
+    def reindex(self):
+        """Rebuilds the indexes, needed when the categories are changed in place"""
+        self._names.clear()
+        self._cogs.clear()
+        self._uncat = None
+        for index, category in enumerate(self._list):
+            self._names.setdefault(category.name, index)
+            self._index_category(category)
+
+    def _index_category(self, category):
+        for cog_name in category.cogs:
+            self._cogs.setdefault(cog_name, category)
+        if category.is_uncat and self._uncat is None:
+            self._uncat = category
 
     def __len__(self):
         return len(self._list)
@@ -58,6 +130,268 @@ class CategoryManager:
         return iter(self._list)
 
 
+class HelpCache:
+    """LRU cache for rendered help, the pages and the command lines"""
+
+    def __init__(self, maxsize: int = 512) -> None:
+        self.maxsize = maxsize
+        self._cache: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        self._cache.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class RuleIndex:
+    """Ids of the users, roles etc with a Permissions cog rule on any cog or command, per guild
+    (None for the global rules). Rebuilt lazily after a permissions command or a cog add/remove"""
+
+    def __init__(self) -> None:
+        self._ids: Optional[Dict[Optional[int], FrozenSet[int]]] = None
+
+    def invalidate(self):
+        self._ids = None
+
+    def rebuild(self, bot):
+        ids = defaultdict(set)
+        for obj in chain(bot.cogs.values(), bot.walk_commands()):
+            if (requires := getattr(obj, "requires", None)) is None:
+                continue
+            ids[None].update(requires._global_rules)
+            for guild_id, rules in requires._guild_rules.items():
+                ids[guild_id].update(rules)
+        self._ids = {guild_id: frozenset(models) for guild_id, models in ids.items()}
+
+    def has_rules(self, bot, model_id: int, guild_id: Optional[int]) -> bool:
+        if self._ids is None:
+            self.rebuild(bot)
+        return any(model_id in self._ids.get(key, ()) for key in (None, guild_id))
+
+
+class CommandIndex:
+    """Flat mapping of every qualified command name (aliases included) to its command,
+    along with an in-memory mirror of the Alias cog's aliases"""
+
+    def __init__(self) -> None:
+        self._commands: Dict[str, Any] = {}
+        self._aliases: Dict[Optional[int], Dict[str, str]] = {}
+        self._dirty = True
+
+    def invalidate(self):
+        """Marks the index for a rebuild, done lazily on the next lookup"""
+        self._dirty = True
+
+    def invalidate_aliases(self):
+        self._aliases.clear()
+
+    def rebuild(self, bot):
+        self._commands.clear()
+        stack = [("", bot.all_commands)]
+        while stack:
+            prefix, all_commands = stack.pop()
+            # all_commands has the command aliases as keys as well
+            for name, command in all_commands.items():
+                qualified_name = prefix + name
+                self._commands[qualified_name] = command
+                if sub_commands := getattr(command, "all_commands", None):
+                    stack.append((qualified_name + " ", sub_commands))
+        self._dirty = False
+
+    def resolve(self, bot, name: str) -> Tuple[Optional[Any], List[str]]:
+        """Returns the deepest command matching the name and the tokens that were not found"""
+        if self._dirty:
+            self.rebuild(bot)
+        tokens = name.split()
+        for index in range(len(tokens), 0, -1):
+            if command := self._commands.get(" ".join(tokens[:index])):
+                return command, tokens[index:]
+        return None, tokens
+
+    def close_matches(self, bot, name: str, limit: int = 10) -> List[Any]:
+        """Commands with names similar to the given name, for did you mean suggestions"""
+        if self._dirty:
+            self.rebuild(bot)
+        matches = get_close_matches(name, self._commands.keys(), n=limit, cutoff=0.5)
+        # Aliases point to the same command, keep the order while removing dupes
+        return list(
+            {id(command): command for command in map(self._commands.get, matches)}.values()
+        )
+
+    async def get_alias(self, alias_cog, guild, alias_name: str) -> Optional[str]:
+        """Same lookup order as the Alias cog's get_alias (global first), but from memory"""
+        alias_cache = alias_cog._aliases
+        if None not in self._aliases:
+            self._aliases[None] = {
+                alias.name: alias.command for alias in await alias_cache.get_global_aliases()
+            }
+        if command := self._aliases[None].get(alias_name):
+            return command
+        if guild is None:
+            return None
+        if guild.id not in self._aliases:
+            self._aliases[guild.id] = {
+                alias.name: alias.command for alias in await alias_cache.get_guild_aliases(guild)
+            }
+        return self._aliases[guild.id].get(alias_name)
+
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index over the command names, aliases and docs, ranked with BM25.
+    Built on the first search, then kept up to date per cog on cog add/remove"""
+
+    # A term counts this many times in the names/aliases and the short doc
+    NAME_WEIGHT = 3
+    SHORT_DOC_WEIGHT = 2
+    # Max terms a query word expands to when it only matches as a prefix
+    MAX_EXPANSIONS = 20
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {qualified name: frequency}
+        self._docs: Dict[str, Tuple[Any, int, Tuple[str, ...]]] = {}  # -> (command, length, terms)
+        self._cogs: Dict[Optional[str], List[str]] = {}  # cog name -> qualified names
+        self._total_length = 0
+        self._vocabulary: Optional[List[str]] = None  # sorted terms, for prefix matches
+        self._dirty = True
+
+    def invalidate(self):
+        """Marks the index for a rebuild, done lazily on the next search"""
+        self._dirty = True
+
+    def rebuild(self, bot):
+        self._postings.clear()
+        self._docs.clear()
+        self._cogs.clear()
+        self._total_length = 0
+        for command in bot.walk_commands():
+            self._add(command)
+        self._dirty = False
+
+    def add_cog(self, cog):
+        if self._dirty:
+            return
+        self.remove_cog(cog.qualified_name)
+        for command in cog.walk_commands():
+            self._add(command)
+
+    def remove_cog(self, cog_name: str):
+        if self._dirty:
+            return
+        for name in self._cogs.pop(cog_name, ()):
+            self._remove(name)
+
+    def _add(self, command):
+        name = command.qualified_name
+        if name in self._docs:
+            return
+        parent = command.full_parent_name
+        names = [name, *(f"{parent} {alias}" if parent else alias for alias in command.aliases)]
+        frequencies: Counter = Counter()
+        for text, weight in (
+            (" ".join(names), self.NAME_WEIGHT),
+            (command.short_doc or "", self.SHORT_DOC_WEIGHT),
+            (command.help or "", 1),
+        ):
+            for term in tokenize(text):
+                frequencies[term] += weight
+        length = sum(frequencies.values())
+        self._docs[name] = (command, length, tuple(frequencies))
+        self._total_length += length
+        self._cogs.setdefault(command.cog_name, []).append(name)
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[name] = frequency
+        self._vocabulary = None
+
+    def _remove(self, name: str):
+        __, length, terms = self._docs.pop(name)
+        self._total_length -= length
+        for term in terms:
+            postings = self._postings[term]
+            del postings[name]
+            if not postings:
+                del self._postings[term]
+        self._vocabulary = None
+
+    def _expand(self, term: str) -> List[str]:
+        """The term itself if indexed, else the indexed terms starting with it"""
+        if term in self._postings:
+            return [term]
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        matches = []
+        index = bisect_left(self._vocabulary, term)
+        while index < len(self._vocabulary) and len(matches) < self.MAX_EXPANSIONS:
+            if not self._vocabulary[index].startswith(term):
+                break
+            matches.append(self._vocabulary[index])
+            index += 1
+        return matches
+
+    def search(self, bot, query: str) -> List[Any]:
+        """Commands matching the query, best match first"""
+        if self._dirty:
+            self.rebuild(bot)
+        doc_count = len(self._docs)
+        if not doc_count:
+            return []
+        average_length = self._total_length / doc_count
+        scores: Dict[str, float] = defaultdict(float)
+        for word in dict.fromkeys(tokenize(query)):
+            for term in self._expand(word):
+                postings = self._postings[term]
+                idf = log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for name, frequency in postings.items():
+                    norm = 1 - self.B + self.B * self._docs[name][1] / average_length
+                    scores[name] += idf * frequency * (self.K1 + 1) / (frequency + self.K1 * norm)
+        # The query being the exact name of a command puts it first
+        if (exact := " ".join(query.lower().split())) in scores:
+            scores[exact] = float("inf")
+        ranked = sorted(scores.items(), key=itemgetter(1), reverse=True)
+        return [self._docs[name][0] for name, __ in ranked]
+
+    def __len__(self):
+        return len(self._docs)
+
+
 # Keeping all global vars in one place
 GLOBAL_CATEGORIES = CategoryManager()
 ARROWS = ArrowManager()
+HELP_CACHE = HelpCache()
+LINE_CACHE = HelpCache(maxsize=8192)
+COMMAND_INDEX = CommandIndex()
+SEARCH_INDEX = SearchIndex()
+PERMISSION_RULES = RuleIndex()
+TAG_CACHE: Dict[str, Tuple[int, List[str]]] = {}  # info.json path -> (mtime, tags), for chelp auto
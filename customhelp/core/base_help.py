@@ -1,34 +1,73 @@
 import asyncio
 import logging
+import sys
 from collections import namedtuple
+from contextlib import suppress
+from contextvars import ContextVar, copy_context
+from copy import copy
 from collections.abc import Iterable
 from itertools import chain
-from typing import Any, Dict, List, Optional, Union, cast
+from operator import itemgetter
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+    cast,
+)
 
 import discord
 from redbot.core import commands
 from redbot.core.commands.commands import Command
 from redbot.core.commands.context import Context
-from redbot.core.commands.help import HelpSettings, NoCommand, NoSubCommand, _, dpy_commands
-from redbot.core.utils.chat_formatting import pagify
+from redbot.core.commands.requires import PermState
+from redbot.core.commands.help import (
+    HelpSettings,
+    NoCommand,
+    NoSubCommand,
+    _,
+    dpy_commands,
+    format_fuzzy_results,
+    fuzzy_command_search,
+)
+from redbot.core.utils.chat_formatting import bold, pagify
 from redbot.core.utils.mod import mass_purge
 from collections import Counter
 from customhelp.core.views import (
+    ArrowButton,
     BaseInteractionMenu,
+    MenuState,
     ReactButton,
     SelectArrowHelpBar,
     SelectMenuHelpBar,
+    arrow_row,
+    persistent_view,
 )
 
-from . import ARROWS, GLOBAL_CATEGORIES
+from . import (
+    ARROWS,
+    COMMAND_INDEX,
+    GLOBAL_CATEGORIES,
+    HELP_CACHE,
+    PERMISSION_RULES,
+    SEARCH_INDEX,
+)
 from .category import Category, get_category
 from .dpy_menus import BaseMenu, arrow_react, home_react, react_page
+from .paginator import chunk_lines, pack_fields
 from .utils import (
+    command_line,
     get_aliases,
     get_cooldowns,
     get_perms,
-    shorten_line,
     get_category_page_mapper_chunk,
+    requires_key,
 )
 
 LOG = logging.getLogger("red.customhelp.core.base_help")
@@ -43,11 +82,122 @@ HelpTarget = Union[
 ]
 
 EmbedField = namedtuple("EmbedField", "name value inline")
+
+
+class Visibility(NamedTuple):
+    """What categories the invoker can see, resolved once per help invocation"""
+
+    is_owner: bool
+    is_nsfw: bool
+    nsfw: FrozenSet[str]
+    dev: FrozenSet[str]
+
+    def can_see(self, name: str) -> bool:
+        # This condition is made using a simple kmap.
+        return (self.is_nsfw or name not in self.nsfw) and (self.is_owner or name not in self.dev)
+
+
+class EmbedPages:
+    """Embed pages built on demand from a generator of field groups, so the first page can be
+    sent before the rest are grouped or built. The page count shows up once it's known"""
+
+    def __init__(self, groups: Iterator[List[EmbedField]], build_page: Callable):
+        self._source = groups
+        self._groups: List[List[EmbedField]] = []
+        self._exhausted = False
+        self._build_page = build_page  # (fields, page_num, page_count) -> discord.Embed
+        self._embeds: Dict[int, tuple] = {}  # index -> (page_count when built, embed)
+
+    def _fill(self, index: int) -> bool:
+        while not self._exhausted and len(self._groups) <= index:
+            try:
+                self._groups.append(next(self._source))
+            except StopIteration:
+                self._exhausted = True
+                if not self._groups:  # This can happen on single command without a docstring
+                    self._groups.append([])
+        return index < len(self._groups)
+
+    @property
+    def page_count(self) -> Optional[int]:
+        return len(self._groups) if self._exhausted else None
+
+    def has_page(self, index: int) -> bool:
+        return index >= 0 and self._fill(index)
+
+    def __len__(self) -> int:
+        self._fill(sys.maxsize)
+        return len(self._groups)
+
+    def __bool__(self) -> bool:
+        return True  # There's always at least one page
+
+    def __getitem__(self, index: int) -> discord.Embed:
+        if index < 0:
+            index += len(self)
+        if not self.has_page(index):
+            raise IndexError("page index out of range")
+        # Peek the next group, so a lone page doesn't get a page header
+        self._fill(index + 1)
+        page_count = self.page_count
+        built_with, embed = self._embeds.get(index, (None, None))
+        if embed is None or built_with != page_count:
+            embed = self._build_page(self._groups[index], index + 1, page_count)
+            self._embeds[index] = (page_count, embed)
+        return embed
+
+    def __iter__(self) -> Iterator[discord.Embed]:
+        index = 0
+        while self.has_page(index):
+            yield self[index]
+            index += 1
+
+
+def has_page(pages: Union[List[str], EmbedPages], index: int) -> bool:
+    """Avoids building every lazy page just to know if there's a next one"""
+    if isinstance(pages, EmbedPages):
+        return pages.has_page(index)
+    return 0 <= index < len(pages)
+
+
+def page_kwargs(page: Union[str, discord.Embed]) -> dict:
+    if isinstance(page, discord.Embed):
+        return {"embed": page, "content": None}
+    return {"content": page, "embed": None}
+
+
+def command_fields(lines: Iterator[str], title: str, continued: str) -> Iterator[EmbedField]:
+    """Fields of the command lines, rendered only when make_embeds gets to their page.
+    The lines are rendered in the contextvars (locale) of the help call that made them"""
+    context = copy_context()
+    chunks = chunk_lines(lines, 500)
+    while (page := context.run(next, chunks, None)) is not None:
+        yield EmbedField(title, page, False)
+        title = continued
+
+
 EMPTY_STRING = "\N{ZERO WIDTH SPACE}"
 
+# Max number of cogs being permission filtered at once for a category
+FILTER_CONCURRENCY = 8
+
+# Max number of commands shown by [p]help search
+SEARCH_RESULTS = 15
+
+# Seconds between two edits of a help menu, the clicks in between only move the page
+# and the menu is edited once to wherever they ended up
+EDIT_INTERVAL = 0.5
+
+# Cache key of the help invocation being rendered, send_pages stores the pages under it
+CACHE_KEY: ContextVar[Optional[tuple]] = ContextVar("customhelp_cache_key", default=None)
+# Target of the help invocation (BaguetteHelp.target_id), used by the persistent menus
+HELP_TARGET: ContextVar[Optional[str]] = ContextVar("customhelp_help_target", default=None)
+# When set, send_pages stores the pages in it instead of sending them
+CAPTURE: ContextVar[Optional[dict]] = ContextVar("customhelp_capture", default=None)
+
 
 # Note to anyone reading this, This is the default formatter deffo, just slightly edited.
-# page_mapping = { category_obj: generated_category_format_page}
+# page_mapping = { category_obj: generated_category_format_page or None if not rendered yet}
 class BaguetteHelp(commands.RedHelpFormatter):
     """In the memory of Jack the virgin"""
 
@@ -72,30 +222,19 @@ class BaguetteHelp(commands.RedHelpFormatter):
 
         alias = None
         alias_name = None
-        # TODO does this wreck havoc?
         if alias_cog := ctx.bot.get_cog("Alias"):
             alias_name = help_for
-            alias = await alias_cog._aliases.get_alias(ctx.guild, alias_name=alias_name)
+            alias = await COMMAND_INDEX.get_alias(alias_cog, ctx.guild, alias_name)
             if alias:
-                help_for = alias.command
+                help_for = alias
 
-        com = ctx.bot
-        last = None
+        # Aliases of the commands are resolved by the index as well
+        com, not_found = COMMAND_INDEX.resolve(ctx.bot, help_for)
+        if com is None:
+            raise NoCommand()
+        if not_found:
+            raise NoSubCommand(last=com, not_found=not_found)
 
-        clist = help_for.split()
-
-        for index, item in enumerate(clist):
-            try:
-                com = com.all_commands[item]
-                # TODO: This doesn't handle valid command aliases.
-                # swap parsing method to use get_command.
-            except (KeyError, AttributeError):
-                if last:
-                    raise NoSubCommand(last=last, not_found=clist[index:]) from None
-                else:
-                    raise NoCommand() from None
-            else:
-                last = com
         # This does take an extra 0.1 seconds to complete. but worth it?
         if alias and alias_name:
             com_alias = com.copy()
@@ -106,28 +245,137 @@ class BaguetteHelp(commands.RedHelpFormatter):
             return com_alias
         return com
 
+    async def command_not_found(self, ctx, help_for, help_settings: HelpSettings):
+        """
+        Sends an error, fuzzy help, or stays quiet based on settings
+        Same as core, but the fuzzy search only checks the closest names from the index
+        """
+        fuzzy_commands = await fuzzy_command_search(
+            ctx,
+            help_for,
+            commands=self.help_filter_func(
+                ctx, COMMAND_INDEX.close_matches(ctx.bot, help_for), help_settings=help_settings
+            ),
+            min_score=75,
+        )
+        use_embeds = await self.embed_requested(ctx)
+        if fuzzy_commands:
+            ret = await format_fuzzy_results(ctx, fuzzy_commands, embed=use_embeds)
+        elif help_settings.verify_exists:
+            ret = _("Help topic for {command_name} not found.").format(command_name=bold(help_for))
+            if use_embeds:
+                ret = discord.Embed(color=(await ctx.embed_color()), description=ret)
+        else:
+            return
+
+        if use_embeds:
+            ret.set_author(
+                name=_("{ctx.me.display_name} Help Menu").format(ctx=ctx),
+                icon_url=ctx.me.display_avatar,
+            )
+            tagline = self.format_tagline(ctx, help_settings.tagline) or self.get_default_tagline(
+                ctx
+            )
+            ret.set_footer(text=tagline)
+            await ctx.send(embed=ret)
+        else:
+            await ctx.send(ret)
+
     async def get_category_help_mapping(
         self, ctx, category, help_settings: HelpSettings, bypass_checks=False
     ):
         # Having bypass_checks to prevent triggering self.blacklist many times.
         if not bypass_checks and not await self.blacklist(ctx, category.name):
             return
-        sorted_iterable = []
         sorted_cogs = sorted(category.cogs)
         isuncategory = False
         if category.name == GLOBAL_CATEGORIES.uncategorised.name:
             isuncategory = True
             sorted_cogs.append(None)  # TODO Need to add commands with no category here as well >_>
+
+        semaphore = asyncio.Semaphore(FILTER_CONCURRENCY)
+
+        async def cog_mapping(cogname, cog):
+            async with semaphore:
+                # can_run mutates ctx.command and ctx.permission_state, so each cog gets a copy
+                return cogname, await self.get_cog_help_mapping(
+                    copy(ctx), cog, help_settings=help_settings
+                )
+
+        tasks = []
         for cogname in sorted_cogs:
             cog = ctx.bot.get_cog(cogname)
             # Simple kmaps for these conditions, math is dark magic
             if ((not cogname) or cog) and (
                 (isuncategory and cogname is None) or (cogname in category.cogs)
             ):
-                cm = await self.get_cog_help_mapping(ctx, cog, help_settings=help_settings)
-                if cm:
-                    sorted_iterable.append((cogname, cm))
-        return sorted_iterable
+                tasks.append(cog_mapping(cogname, cog))
+
+        # gather keeps the order, so the cogs stay sorted
+        return [(cogname, cm) for cogname, cm in await asyncio.gather(*tasks) if cm]
+
+    async def get_cog_help_mapping(
+        self, ctx: Context, obj: Optional[commands.Cog], help_settings: HelpSettings
+    ):
+        if obj is None:
+            cog_commands = [c for c in ctx.bot.commands if c.parent is None and c.cog is None]
+        else:
+            cog_commands = obj.get_commands()
+            # Every top level command runs the cog's requires as well,
+            # check it once for the whole cog and skip the commands if it fails.
+            if help_settings.verify_checks and cog_commands:
+                cog_ctx = copy(ctx)
+                cog_ctx.command = cog_commands[0]
+                cog_ctx.permission_state = PermState.NORMAL
+                if not await obj.can_run(cog_ctx):
+                    return {}
+                # Permission hooks of other cogs may look at the command, nothing is shared then
+                if not ctx.bot._permissions_hooks:
+                    return {
+                        com.name: com
+                        async for com in self.filter_shared_requires(
+                            cog_ctx, cog_commands, help_settings
+                        )
+                    }
+
+        return {
+            com.name: com
+            async for com in self.help_filter_func(ctx, cog_commands, help_settings=help_settings)
+        }
+
+    async def filter_shared_requires(
+        self, cog_ctx: Context, cog_commands: List[Command], help_settings: HelpSettings
+    ):
+        """help_filter_func for the top level commands of a cog, with verify_checks.
+        cog_ctx is in the permission state the cog's requires left it in. Commands with the
+        same privilege level and permissions share one Requires.verify, unless they have
+        requires checks or permission rules of their own"""
+        verdicts: Dict[tuple, bool] = {}
+        cog_state = cog_ctx.permission_state
+        guild_id = cog_ctx.guild and cog_ctx.guild.id
+        for com in cog_commands:
+            if (key := requires_key(com.requires, guild_id)) is None:
+                async for visible in self.help_filter_func(
+                    copy(cog_ctx), (com,), help_settings=help_settings
+                ):
+                    yield visible
+                continue
+            if (com.hidden and not help_settings.show_hidden) or not com.enabled:
+                continue
+            try:
+                # The checks Red's can_run runs before the requires, per command
+                if not await dpy_commands.Command.can_run(com, cog_ctx):
+                    continue
+            except discord.DiscordException:
+                continue
+            if key not in verdicts:
+                cog_ctx.command, cog_ctx.permission_state = com, cog_state
+                try:
+                    verdicts[key] = await com.requires.verify(cog_ctx)
+                except discord.DiscordException:
+                    verdicts[key] = False
+            if verdicts[key]:
+                yield com
 
     async def send_help(
         self,
@@ -142,17 +390,21 @@ class BaguetteHelp(commands.RedHelpFormatter):
 
         help_settings = await HelpSettings.from_context(ctx)
 
-        if help_for is None or isinstance(help_for, dpy_commands.bot.BotBase):
-            await self.format_bot_help(ctx, help_settings=help_settings)
-            return
+        if isinstance(help_for, dpy_commands.bot.BotBase):
+            help_for = None
 
         if isinstance(help_for, str):
             try:
                 help_for = await self.parse_command(ctx, help_for)  # type:ignore
-            except NoCommand:
-                await self.command_not_found(ctx, help_for, help_settings=help_settings)
-                return
-            except NoSubCommand as exc:
+            except (NoCommand, NoSubCommand) as exc:
+                if isinstance(exc, NoCommand):
+                    # A command or cog called search still wins over the search itself
+                    keyword, __, query = help_for.partition(" ")
+                    if keyword.lower() == "search" and query.strip():
+                        await self.send_search_help(ctx, query, help_settings)
+                        return
+                    await self.command_not_found(ctx, help_for, help_settings=help_settings)
+                    return
                 if help_settings.verify_exists:
                     await self.subcommand_not_found(
                         ctx, exc.last, exc.not_found, help_settings=help_settings
@@ -160,12 +412,129 @@ class BaguetteHelp(commands.RedHelpFormatter):
                     return
                 help_for = exc.last
 
-        if isinstance(help_for, commands.Cog):
-            await self.format_cog_help(ctx, help_for, help_settings=help_settings)
+        token = HELP_TARGET.set(self.target_id(help_for))
+        try:
+            if help_for is None:
+                await self.send_cached(ctx, None, help_settings, self.format_bot_help)
+            elif isinstance(help_for, commands.Cog):
+                await self.send_cached(ctx, help_for, help_settings, self.format_cog_help)
+            elif isinstance(help_for, Category):
+                await self.send_cached(ctx, help_for, help_settings, self.format_category_help)
+            else:
+                await self.format_command_help(ctx, help_for, help_settings=help_settings)
+        finally:
+            HELP_TARGET.reset(token)
+
+    async def send_search_help(self, ctx: Context, query: str, help_settings: HelpSettings):
+        """[p]help search <terms>, the best matching commands the invoker can see"""
+        if not await ctx.embed_requested():
+            await ctx.send(_("You need to enable embeds to use the help menu"))
+            return
+
+        visibility = await self.get_visibility(ctx)
+
+        def visible(command):
+            category = GLOBAL_CATEGORIES.from_cog(command.cog and command.cog.qualified_name)
+            category = category or GLOBAL_CATEGORIES.uncategorised
+            return visibility.can_see(category.name)
+
+        ranked = filter(visible, SEARCH_INDEX.search(ctx.bot, query))
+        results = []
+        # Ranked first, so only the checks of the shown commands are run
+        async for command in self.help_filter_func(ctx, ranked, help_settings=help_settings):
+            results.append(command)
+            if len(results) >= SEARCH_RESULTS:
+                break
+
+        if not results:
+            await ctx.send(_("No commands found for {query}.").format(query=bold(query)))
+            return
+
+        emb = await self.embed_template(help_settings, ctx)
+        emb["embed"]["title"] = _("Search results for {query}").format(query=query[:200])
+        spacing = len(max((command.qualified_name for command in results), key=len))
+        lines = (
+            command_line(ctx, command.qualified_name, command, spacing) for command in results
+        )
+        title = _("**__Commands:__**")
+        for page in chunk_lines(lines, 500):
+            emb["fields"].append(EmbedField(title, page, False))
+            title = EMPTY_STRING
+        pages = await self.make_embeds(ctx, emb, help_settings=help_settings)
+        await self.send_pages(ctx, pages, embed=True, help_settings=help_settings)
+
+    async def get_cache_key(self, ctx: Context, help_for, help_settings: HelpSettings, formatter):
+        """Key for HELP_CACHE, members with the same roles and permissions share the pages.
+        Members with a permission rule of their own get pages of their own"""
+        if help_for is None:
+            target = ("main",)
         elif isinstance(help_for, Category):
-            await self.format_category_help(ctx, help_for, help_settings=help_settings)
+            target = ("category", help_for.name)
         else:
-            await self.format_command_help(ctx, help_for, help_settings=help_settings)
+            target = ("cog", help_for.qualified_name)
+
+        is_owner = (await self.get_visibility(ctx)).is_owner
+        if ctx.guild:
+            fingerprint = (
+                is_owner,
+                ctx.guild.owner_id == ctx.author.id,
+                ctx.channel.id,
+                tuple(sorted(role.id for role in ctx.author.roles)),
+                ctx.channel.permissions_for(ctx.author).value,
+            )
+            if PERMISSION_RULES.has_rules(ctx.bot, ctx.author.id, ctx.guild.id):
+                fingerprint += (ctx.author.id,)
+        else:
+            fingerprint = (is_owner, ctx.author.id)
+
+        return (
+            target,
+            ctx.guild and ctx.guild.id,
+            fingerprint,
+            (await ctx.embed_color()).value,
+            await ctx.embed_requested(),
+            ctx.clean_prefix,
+            help_settings,
+            formatter.__qualname__,  # the theme
+        )
+
+    async def send_cached(
+        self,
+        ctx: Context,
+        help_for,
+        help_settings: HelpSettings,
+        formatter,
+        use_cache: bool = True,
+    ):
+        """Sends the pages from HELP_CACHE if present, else renders them with the formatter.
+        Without use_cache the pages are rendered and HELP_CACHE is left untouched"""
+        if not use_cache:
+            if help_for is None:
+                await formatter(ctx, help_settings=help_settings)
+            else:
+                await formatter(ctx, help_for, help_settings=help_settings)
+            return
+
+        key = await self.get_cache_key(ctx, help_for, help_settings, formatter)
+        if cached := HELP_CACHE.get(key):
+            # The menus fill their page_mapping as categories get opened, each gets its own
+            await self.send_pages(
+                ctx,
+                cached["pages"],
+                cached["embed"],
+                dict(cached["page_mapping"]),
+                help_settings=help_settings,
+            )
+            return
+
+        token = CACHE_KEY.set(key)
+        try:
+            if help_for is None:
+                await formatter(ctx, help_settings=help_settings)
+            else:
+                await formatter(ctx, help_for, help_settings=help_settings)
+        finally:
+            CACHE_KEY.reset(token)
 
     async def format_category_help(
         self,
@@ -188,21 +557,16 @@ class BaguetteHelp(commands.RedHelpFormatter):
             if description := obj.long_desc or "":
                 emb["embed"]["description"] = f"{description[:250]}"
 
-            all_cog_text = ""
             spacer_list = chain(*(i[1].keys() for i in coms))
             spacing = len(max(spacer_list, key=len))
-            for cog_name, data in coms:
-                cog_text = "\n" + "\n".join(
-                    shorten_line(f"`{name:<{spacing}}:`{command.format_shortdoc_for_context(ctx)}")
-                    for name, command in sorted(data.items())
-                )
-                all_cog_text += cog_text
-            all_cog_text = "\n".join(sorted(all_cog_text.split("\n")))
-            title = obj.name.capitalize()
-            for page in pagify(all_cog_text, page_length=500, shorten_by=0):
-                field = EmbedField(title, page, False)
-                emb["fields"].append(field)
-                title = EMPTY_STRING
+            # Sort the commands of every cog once by name, the lines come pre-rendered
+            all_commands = sorted(chain(*(data.items() for __, data in coms)), key=itemgetter(0))
+            all_cog_text = (
+                command_line(ctx, name, command, spacing) for name, command in all_commands
+            )
+            emb["fields"] = chain(
+                emb["fields"], command_fields(all_cog_text, obj.name.capitalize(), EMPTY_STRING)
+            )
 
             pages = await self.make_embeds(ctx, emb, help_settings=help_settings)
             if get_pages:
@@ -224,17 +588,18 @@ class BaguetteHelp(commands.RedHelpFormatter):
 
             if coms:
                 spacing = len(max(coms.keys(), key=len))
-                command_text = "\n".join(
-                    shorten_line(f"`{name:<{spacing}}:`{command.format_shortdoc_for_context(ctx)}")
+                command_text = (
+                    command_line(ctx, name, command, spacing)
                     for name, command in sorted(coms.items())
                 )
-                for i, page in enumerate(pagify(command_text, page_length=500, shorten_by=0)):
-                    if i == 0:
-                        title = _("**__Commands:__**")
-                    else:
-                        title = _("**__Commands:__** (continued)")
-                    field = EmbedField(title, page, False)
-                    emb["fields"].append(field)
+                emb["fields"] = chain(
+                    emb["fields"],
+                    command_fields(
+                        command_text,
+                        _("**__Commands:__**"),
+                        _("**__Commands:__** (continued)"),
+                    ),
+                )
 
             pages = await self.make_embeds(ctx, emb, help_settings=help_settings)
             await self.send_pages(ctx, pages, embed=True, help_settings=help_settings)
@@ -296,17 +661,13 @@ class BaguetteHelp(commands.RedHelpFormatter):
 
             if subcommands:
                 spacing = len(max(subcommands.keys(), key=len))
-                subtext = "\n" + "\n".join(
-                    shorten_line(f"`{name:<{spacing}}:`{command.format_shortdoc_for_context(ctx)}")
+                subtext = (
+                    command_line(ctx, name, command, spacing)
                     for name, command in sorted(subcommands.items())
                 )
-                for i, page in enumerate(pagify(subtext, page_length=500, shorten_by=0)):
-                    if i == 0:
-                        title = _("**__Subcommands:__**")
-                    else:
-                        title = EMPTY_STRING
-                    field = EmbedField(title, page, False)
-                    emb["fields"].append(field)
+                emb["fields"] = chain(
+                    emb["fields"], command_fields(subtext, _("**__Subcommands:__**"), EMPTY_STRING)
+                )
             pages = await self.make_embeds(ctx, emb, help_settings=help_settings)
             await self.send_pages(ctx, pages, embed=True, help_settings=help_settings)
         else:
@@ -374,8 +735,10 @@ class BaguetteHelp(commands.RedHelpFormatter):
         embed_dict: dict,
         help_settings: HelpSettings,
     ):
-        """Returns Embed pages (Really copy paste from core)"""
-        pages = []
+        """Returns Embed pages (Really copy paste from core), built lazily as they are viewed.
+        The fields can be a lazy iterable (see command_fields), the command lines of the later
+        pages are then rendered when those pages are. The commands are permission filtered
+        before this is called though, that part isn't lazy"""
         thumbnail_url = embed_dict.get("thumbnail", None) or self.settings["thumbnail"]
         page_char_limit = help_settings.page_char_limit
         page_char_limit = min(page_char_limit, 5500)
@@ -394,26 +757,19 @@ class BaguetteHelp(commands.RedHelpFormatter):
         elif page_char_limit < 250:
             page_char_limit = 250
 
-        field_groups = self.group_embed_fields(embed_dict["fields"], page_char_limit)
-
         color = await ctx.embed_color()
-        page_count = len(field_groups)
 
-        if not field_groups:  # This can happen on single command without a docstring
+        def build_page(group, page_num, page_count):
             embed = discord.Embed(color=color, **embed_dict["embed"])
-            embed.set_author(**author_info)
-            embed.set_footer(**embed_dict["footer"])
-            if thumbnail_url:
-                embed.set_thumbnail(url=thumbnail_url)
-            pages.append(embed)
 
-        for i, group in enumerate(field_groups, 1):
-            embed = discord.Embed(color=color, **embed_dict["embed"])
-
-            if page_count > 1:
+            if page_count is None:  # Later pages haven't been grouped yet
+                embed.description = _("Page {page_num}\n{content_description}").format(
+                    content_description=embed.description, page_num=page_num
+                )
+            elif page_count > 1:
                 description = _("Page {page_num} of {page_count}\n{content_description}").format(
                     content_description=embed.description,
-                    page_num=i,
+                    page_num=page_num,
                     page_count=page_count,
                 )
                 embed.description = description
@@ -426,16 +782,17 @@ class BaguetteHelp(commands.RedHelpFormatter):
             embed.set_footer(**embed_dict["footer"])
             if thumbnail_url:
                 embed.set_thumbnail(url=thumbnail_url)
-            pages.append(embed)
+            return embed
 
-        return pages
+        groups = pack_fields(embed_dict["fields"], page_char_limit, reserved=offset)
+        return EmbedPages(groups, build_page)
 
     async def send_pages(
         self,
         ctx: Context,
-        pages: List[Union[str, discord.Embed]],
+        pages: Union[List[str], EmbedPages],
         embed: bool = True,
-        page_mapping: Dict[Category, List] = {},
+        page_mapping: Dict[Category, Optional[List]] = {},
         *,
         help_settings: HelpSettings,
     ):
@@ -443,6 +800,15 @@ class BaguetteHelp(commands.RedHelpFormatter):
         Sends pages based on settings.
         If page_mapping is non-empty, then it's the main help menu and we need to add the home button
         """
+        if (key := CACHE_KEY.get()) is not None:
+            CACHE_KEY.set(None)
+            # A snapshot, the menu started below fills page_mapping as categories get opened
+            snapshot = MappingProxyType(dict(page_mapping))
+            HELP_CACHE.set(key, {"pages": pages, "embed": embed, "page_mapping": snapshot})
+
+        if (captured := CAPTURE.get()) is not None:
+            captured.update(pages=pages, page_mapping=page_mapping)
+            return
 
         # save on config calls
         channel_permissions = ctx.channel.permissions_for(ctx.me)
@@ -493,38 +859,165 @@ class BaguetteHelp(commands.RedHelpFormatter):
                     await mass_purge(messages, channel)
 
                 asyncio.create_task(_delete_delay_help(destination, messages, delete_delay))
+        elif state := self.persistent_state(ctx, page_mapping):
+            view = persistent_view(
+                self.settings, state, list(page_mapping), not has_page(pages, 1)
+            )
+            if self.settings["replies"]:
+                await ctx.reply(**page_kwargs(pages[0]), view=view, mention_author=False)
+            else:
+                await ctx.send(**page_kwargs(pages[0]), view=view)
         else:
             menu = HybridMenus(self.settings, help_settings, page_mapping, pages)
             await menu.start(ctx)
 
+    # PERSISTENT MENUS #
+    @staticmethod
+    def target_id(help_for) -> str:
+        """Help target as stored in the custom_ids of the persistent menus"""
+        if help_for is None:
+            return "h"
+        if isinstance(help_for, Category):
+            return "k" + help_for.name
+        if isinstance(help_for, commands.Cog):
+            return "c" + help_for.qualified_name
+        return "m" + help_for.qualified_name
+
+    def persistent_state(self, ctx, page_mapping) -> Optional[MenuState]:
+        """State of a new persistent menu, None if this menu can't be persistent"""
+        target = HELP_TARGET.get()
+        if (
+            not self.settings["persistent"]
+            or target is None
+            # Reactions can't outlive the menu
+            or "emojis" in (self.settings["menutype"], self.settings["arrowtype"])
+        ):
+            return None
+        state = MenuState(ctx.author.id, 0, bool(page_mapping), target)
+        return state if state.fits(page_mapping) else None
+
+    async def render_pages(
+        self, ctx, target: str, help_settings: HelpSettings, use_cache: bool = True
+    ) -> dict:
+        """Renders the pages of a target without sending them, goes through HELP_CACHE as well
+        unless use_cache is False. Empty if the target is gone or has nothing to show"""
+        kind, name = target[0], target[1:]
+        captured: dict = {}
+        token = CAPTURE.set(captured)
+        try:
+            if kind == "h":
+                await self.send_cached(ctx, None, help_settings, self.format_bot_help, use_cache)
+            elif kind == "k":
+                if category := get_category(name):
+                    await self.send_cached(
+                        ctx, category, help_settings, self.format_category_help, use_cache
+                    )
+            elif kind == "c":
+                if cog := ctx.bot.get_cog(name):
+                    await self.send_cached(
+                        ctx, cog, help_settings, self.format_cog_help, use_cache
+                    )
+            else:
+                with suppress(NoCommand, NoSubCommand):
+                    command = await self.parse_command(ctx, name)
+                    await self.format_command_help(ctx, command, help_settings=help_settings)
+        finally:
+            CAPTURE.reset(token)
+        return captured
+
+    async def context_from_interaction(self, interaction: discord.Interaction) -> Context:
+        """Context of a help command invoked by whoever clicked"""
+        message = copy(interaction.message)
+        message.author = interaction.user
+        prefix = (await self.bot.get_valid_prefixes(interaction.guild))[0]
+        message.content = f"{prefix}help"
+        return await self.bot.get_context(message)
+
+    async def handle_interaction(self, interaction: discord.Interaction):
+        """Handles a click on a persistent menu, the state comes from the custom_id"""
+        action, state = MenuState.from_custom_id(interaction.data["custom_id"])
+        if interaction.user.id not in (state.author_id, *self.bot.owner_ids):
+            await interaction.response.send_message(
+                "You cannot use this help menu.", ephemeral=True
+            )
+            return
+
+        if action in ("menu", "arrow"):
+            value = interaction.data["values"][0]
+            if value == "Home":
+                action, state = "go", state._replace(target="h", page=0)
+            elif action == "menu":
+                action, state = "go", state._replace(target="k" + value, page=0)
+            else:
+                action = value
+
+        await interaction.response.defer()
+        if action == "cross":
+            await interaction.message.delete()
+            return
+
+        ctx = await self.context_from_interaction(interaction)
+        help_settings = await HelpSettings.from_context(ctx)
+        rendered = await self.render_pages(ctx, state.target, help_settings)
+        if not rendered:
+            await interaction.followup.send(
+                "There's nothing to show here anymore.", ephemeral=True
+            )
+            return
+
+        pages = rendered["pages"]
+        page = state.page
+        if action == "force_left":
+            page = 0
+        elif action == "left":
+            page = page - 1 if page > 0 else len(pages) - 1
+        elif action == "right":
+            page = page + 1 if has_page(pages, page + 1) else 0
+        elif action == "force_right":
+            page = len(pages) - 1
+        if not has_page(pages, page):  # The help got shorter since
+            page = 0
+        state = state._replace(page=page)
+
+        categories = []
+        if state.nav:
+            home = rendered
+            if state.target != "h":
+                home = await self.render_pages(ctx, "h", help_settings)
+            categories = list(home.get("page_mapping", ()))
+
+        view = persistent_view(self.settings, state, categories, not has_page(pages, 1))
+        await interaction.edit_original_response(**page_kwargs(pages[page]), view=view)
+
+    async def get_visibility(self, ctx) -> "Visibility":
+        """Resolves the owner/nsfw checks once per help invocation and keeps them on the context,
+        so the lazily rendered menu pages reuse them as well"""
+        if (visibility := getattr(ctx, "_chelp_visibility", None)) is None:
+            blocklist = self.blacklist_names
+            visibility = Visibility(
+                is_owner=await self.bot.is_owner(ctx.author),
+                is_nsfw=ctx.channel.is_nsfw() if hasattr(ctx.channel, "is_nsfw") else True,
+                nsfw=frozenset(blocklist["nsfw"]),
+                dev=frozenset(blocklist["dev"]),
+            )
+            ctx._chelp_visibility = visibility
+        return visibility
+
     async def blacklist(self, ctx, name) -> bool:
         """Some blacklist checks utils
         Returns true if needed to be shown"""
-        blocklist = self.blacklist_names
-        a = (
-            ctx.channel.is_nsfw() if hasattr(ctx.channel, "is_nsfw") else True
-        ) or name not in blocklist["nsfw"]
-
-        b = await self.bot.is_owner(ctx.author) or name not in blocklist["dev"]
-        return a and b
+        return (await self.get_visibility(ctx)).can_see(name)
 
     async def filter_categories(self, ctx, categories: Iterable) -> list:
         """Applies blacklist to all the categories, Filters based on the current context"""
-        blocklist = self.blacklist_names
-        is_owner = await self.bot.is_owner(ctx.author)
-        final = []
-        for name in categories:
-            # This condition is made using a simple kmap.
-            if (
-                (ctx.channel.is_nsfw() if hasattr(ctx.channel, "is_nsfw") else True)
-                or name not in blocklist["nsfw"]
-            ) and (is_owner or name not in blocklist["dev"]):
-                final.append(name)
-        return final
+        visibility = await self.get_visibility(ctx)
+        return [category for category in categories if visibility.can_see(category.name)]
 
 
 class HybridMenus:
-    def __init__(self, settings, helpsettings, page_mapping: Dict[Category, List], pages):
+    def __init__(
+        self, settings, helpsettings, page_mapping: Dict[Category, Optional[List]], pages
+    ):
         self.arrow_emoji_button = {
             "force_left": self.first_page,
             "left": self.prev_page,
@@ -539,30 +1032,89 @@ class HybridMenus:
 
         # Source specific
         self.curr_page = 0
-        self.pages: List[Union[str, discord.Embed]] = pages
+        self.pages: Union[List[str], EmbedPages] = pages
         self.category_page_mapping = page_mapping
+        # The menu always starts on the home page when categories are mapped
+        self.home_pages = pages if page_mapping else None
         self.no_arrows_yet = False
 
+        # Edit coalescing, see show_current_page
+        self._last_edit = float("-inf")
+        self._pending_edit: Optional[tuple] = None  # (interaction or message, edit kwargs)
+        self._flush_task: Optional[asyncio.Task] = None
+
     async def get_pages(self, ctx: commands.Context, category_name: str):
-        if not (category_pages := self.category_page_mapping.get(category_name)):
-            if category_name.lower() == "home":
-                category_pages = await ctx.bot._help_formatter.format_bot_help(
+        if category_name.lower() == "home":
+            if self.home_pages is None:
+                self.home_pages = await ctx.bot._help_formatter.format_bot_help(
                     ctx, self.help_settings, get_pages=True
                 )
-            self.category_page_mapping[category_name] = category_pages
+            return self.home_pages
+
+        if (category := get_category(category_name)) is None:
+            return []
+        # Category pages are rendered on demand, the first time they are asked for
+        category_pages = self.category_page_mapping.get(category)
+        if category_pages is None:
+            category_pages = await ctx.bot._help_formatter.format_category_help(
+                ctx, category, self.help_settings, get_pages=True
+            )
+            # Empty list so a category with nothing to show isn't re-rendered on every click
+            category_pages = category_pages or []
+            self.category_page_mapping[category] = category_pages
 
         return category_pages
 
+    def has_page(self, index: int) -> bool:
+        return has_page(self.pages, index)
+
     def change_source(self, new_source):
         self.pages = new_source
         self.curr_page = 0
 
     async def show_current_page(self, interaction, **kwargs):
+        """Edits the menu to the current page. Clicks coming faster than EDIT_INTERVAL are
+        acknowledged right away and coalesced into a single edit to the last page asked for"""
         data = self._get_kwargs_from_page(self.pages[self.curr_page])
+        data.update(kwargs)
+        if self._flush_task is None and self._since_last_edit() >= EDIT_INTERVAL:
+            await self._edit(interaction, data, respond=True)
+            return
+
+        if not isinstance(interaction, discord.Message):
+            await interaction.response.defer()
+        if self._pending_edit is not None:
+            # Keep a view swapped in by a superseded click
+            data = {**self._pending_edit[1], **data}
+        self._pending_edit = (interaction, data)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_edits())
+
+    def _since_last_edit(self) -> float:
+        return asyncio.get_running_loop().time() - self._last_edit
+
+    async def _edit(self, interaction, data: dict, respond: bool):
+        self._last_edit = asyncio.get_running_loop().time()
         if isinstance(interaction, discord.Message):
-            await interaction.edit(**data, **kwargs)
+            await interaction.edit(**data)
+        elif respond:
+            await interaction.response.edit_message(**data)
         else:
-            await interaction.response.edit_message(**data, **kwargs)
+            # Already deferred
+            await interaction.edit_original_response(**data)
+
+    async def _flush_edits(self):
+        try:
+            while self._pending_edit is not None:
+                await asyncio.sleep(EDIT_INTERVAL - self._since_last_edit())
+                interaction, data = self._pending_edit
+                self._pending_edit = None
+                try:
+                    await self._edit(interaction, data, respond=False)
+                except discord.HTTPException:
+                    LOG.debug("Couldn't edit the help menu", exc_info=True)
+        finally:
+            self._flush_task = None
 
     async def start(self, ctx):
         await self.create_menutype()
@@ -647,7 +1199,7 @@ class HybridMenus:
             else:
                 dpy_menu = self.menus[0]
 
-            if len(self.pages) == 1:
+            if not self.has_page(1):
                 self.no_arrows_yet = True
                 dpy_menu.add_button(await arrow_react(ARROWS["cross"]))
             else:
@@ -691,29 +1243,9 @@ class HybridMenus:
                             )
                         )
 
-                class Button(discord.ui.Button):
-                    view: BaseInteractionMenu
-
-                    def __init__(self, name, row=4, **kwargs):
-                        self.name = name
-                        super().__init__(**kwargs, row=row)
-
-                    async def callback(self, interaction):
-                        await self.view.hmenu.arrow_emoji_button[self.name](interaction)
-
                 if self.settings["nav"]:
-                    if len(self.pages) == 1:
-                        self.no_arrows_yet = True
-                        arrow = ARROWS["cross"]
-                        button = Button(arrow.name, **arrow.items(), row=None)
-                        view_menu.add_item(button)
-                    else:
-                        for arrow in ARROWS:
-                            if arrow.name == "home":
-                                continue
-                            # TODO remove subclass later (dont need a state for each button)
-                            button = Button(arrow.name, **arrow.items())
-                            view_menu.add_item(button)
+                    self.no_arrows_yet = not self.has_page(1)
+                    self.add_arrow_buttons(view_menu)
 
             else:  # Select
                 options = []
@@ -739,10 +1271,16 @@ class HybridMenus:
                 select_bar = SelectArrowHelpBar(options)
                 view_menu.add_item(select_bar)
 
+    def add_arrow_buttons(self, view_menu: BaseInteractionMenu):
+        for name, kwargs in arrow_row(tuple(ARROWS), not self.has_page(1)):
+            view_menu.add_item(ArrowButton(name, **kwargs))
+
     def stop(self):
         for menu in self.menus:
             if menu:
                 menu.stop()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
 
     # MENU ACTIONS BLOCK #
     async def category_react_action(
@@ -753,7 +1291,8 @@ class HybridMenus:
 
             # Dynamically pull up arrows if we have more than one page
             # And we maintain the arrows, even if we go back to pages of size 1
-            if self.no_arrows_yet and len(self.pages) > 1:
+            if self.no_arrows_yet and self.has_page(1):
+                self.no_arrows_yet = False
                 if self.settings["arrowtype"] == "emojis":
                     # Copy Pasta from create_arrowtype
                     for arrow in ARROWS:
@@ -766,30 +1305,21 @@ class HybridMenus:
                             continue
                         if self.settings["nav"]:
                             await self.menus[0].add_button(await arrow_react(arrow), react=True)
-
-                if self.settings["arrowtype"] == "buttons":
-                    # Buttons/select
-                    # We recreate the menu, so we can add the arrows
-                    sender_ctx = self.menus[1].ctx
-                    bot_message = self.menus[1].message
-
-                    # This is needed for the interaction to not failed,
-                    # when the category is a button
-                    if type(interaction) == discord.Interaction:
-                        await interaction.response.defer()
-
-                    self.menus[1].clear_items()
-
-                    await self.create_menutype()
-                    await self.create_arrowtype(sender_ctx)
-                    await self.menus[1].start(ctx=sender_ctx, message=bot_message)
-
-                if any(self.menus):
-                    await self.show_current_page(self.bot_message, view=self.menus[1])
-
-                self.no_arrows_yet = False
+                    await self.show_current_page(interaction)
+                else:
+                    # Only the arrow row changes, the lone cross makes way for the full row
+                    view_menu = self.menus[1]
+                    for child in [c for c in view_menu.children if isinstance(c, ArrowButton)]:
+                        view_menu.remove_item(child)
+                    self.add_arrow_buttons(view_menu)
+                    await self.show_current_page(interaction, view=view_menu)
             else:
                 await self.show_current_page(interaction)
+        elif isinstance(interaction, discord.Interaction):
+            # Lazily rendered category turned out empty for this user, checks can change since
+            await interaction.response.send_message(
+                _("No commands available in this category."), ephemeral=True
+            )
 
     async def home_page(self, ctx, interaction):
         self.change_source(await self.get_pages(ctx, "home"))
@@ -804,7 +1334,7 @@ class HybridMenus:
         await self.show_current_page(interaction)
 
     async def next_page(self, interaction):
-        if self.curr_page < len(self.pages) - 1:
+        if self.has_page(self.curr_page + 1):
             self.curr_page += 1
             await self.show_current_page(interaction)
         else:
@@ -1,5 +1,6 @@
-from dataclasses import dataclass, asdict
-from typing import Optional
+from collections.abc import Set
+from dataclasses import dataclass
+from typing import AbstractSet, Dict, Iterable, Optional
 
 import discord
 from redbot.core import commands
@@ -7,26 +8,129 @@ from redbot.core import commands
 from . import GLOBAL_CATEGORIES
 
 
-@dataclass
-class Category:
-    name: str
-    desc: str
-    cogs: list
-    is_uncat: bool = False
-    reaction: Optional[str] = None
-    long_desc: Optional[str] = None
-    thumbnail: Optional[str] = None
-    label: str = ""
-    style: str = "primary"
+class CogsView(Set):
+    """Read-only view of the cogs of a category, in the order they were added.
+    The edits go through the Category methods"""
 
-    def __eq__(self, item):
-        return item == self.name
+    __slots__ = ("_cogs",)
+
+    def __init__(self, cogs: Dict[str, None]):
+        self._cogs = cogs
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        # Results of the set operators are plain frozensets
+        return frozenset(iterable)
+
+    def __contains__(self, cog) -> bool:
+        return cog in self._cogs
+
+    def __iter__(self):
+        return iter(self._cogs)
+
+    def __len__(self) -> int:
+        return len(self._cogs)
+
+    def __repr__(self) -> str:
+        return f"CogsView({list(self._cogs)!r})"
+
+
+class Category:
+    """A category of cogs. Slotted, with the cogs as the keys of a dict for O(1) membership tests
+    and edits that keep the order they were added in.
+    Equal to another category with the same name, page_mapping is keyed by these"""
+
+    __slots__ = (
+        "name",
+        "desc",
+        "_cogs",
+        "is_uncat",
+        "reaction",
+        "long_desc",
+        "thumbnail",
+        "label",
+        "style",
+    )
+    # Config keys, in order
+    FIELDS = (
+        "name",
+        "desc",
+        "cogs",
+        "is_uncat",
+        "reaction",
+        "long_desc",
+        "thumbnail",
+        "label",
+        "style",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        desc: str,
+        cogs: Iterable[str] = (),
+        is_uncat: bool = False,
+        reaction: Optional[str] = None,
+        long_desc: Optional[str] = None,
+        thumbnail: Optional[str] = None,
+        label: str = "",
+        style: str = "primary",
+    ):
+        self.name = name
+        self.desc = desc
+        self.cogs = cogs
+        self.is_uncat = is_uncat
+        self.reaction = reaction
+        self.long_desc = long_desc
+        self.thumbnail = thumbnail
+        self.label = label
+        self.style = style
+
+    @property
+    def cogs(self) -> AbstractSet[str]:
+        return CogsView(self._cogs)
+
+    @cogs.setter
+    def cogs(self, cogs: Iterable[str]):
+        self._cogs = dict.fromkeys(cogs)
+
+    def add_cogs(self, *cog_names: str):
+        """Appends the cogs, the ones already present keep their place"""
+        self._cogs.update(dict.fromkeys(cog_names))
+
+    def remove_cogs(self, *cog_names: str):
+        for cog_name in cog_names:
+            self._cogs.pop(cog_name, None)
+
+    def keep_cogs(self, cog_names: Iterable[str]):
+        """Removes the cogs not in cog_names"""
+        cog_names = set(cog_names)
+        self._cogs = {cog_name: None for cog_name in self._cogs if cog_name in cog_names}
+
+    def __eq__(self, other):
+        if isinstance(other, Category):
+            return self.name == other.name
+        return NotImplemented
 
     def __hash__(self) -> int:
         return hash(self.name)
 
+    def __repr__(self) -> str:
+        return f"<Category name={self.name!r} cogs={len(self._cogs)}>"
+
     def to_dict(self) -> dict:
-        return asdict(self)
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data["cogs"] = list(self._cogs)
+        return data
+
+    def to_config(self) -> dict:
+        """to_dict, but with the reaction as a string. The uncategorised cogs aren't saved"""
+        data = self.to_dict()
+        if self.reaction is not None:
+            data["reaction"] = str(self.reaction)
+        if self.is_uncat:
+            data["cogs"] = []
+        return data
 
 
 @dataclass(frozen=True)
@@ -54,9 +158,7 @@ def get_category(category: Optional[str]) -> Optional[Category]:
     if not category:
         return
 
-    for x in GLOBAL_CATEGORIES:
-        if x.name == category:
-            return x
+    return GLOBAL_CATEGORIES.find(category)
 
 
 class CategoryConvert(commands.Converter):
@@ -0,0 +1,223 @@
+# Static export of the help, for serving it from a website (chelp export)
+# Pages are rendered by the active theme through make_embeds, only changed cogs get re-rendered.
+
+import asyncio
+import hashlib
+import html
+import json
+from copy import copy
+from dataclasses import replace
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import discord
+from redbot.core.commands.help import HelpSettings
+
+from . import GLOBAL_CATEGORIES
+from .base_help import Visibility
+
+MANIFEST = "manifest.json"
+
+
+def digest(*parts: Any) -> str:
+    return hashlib.sha1("\0".join(map(str, parts)).encode()).hexdigest()
+
+
+def cog_digest(cog) -> str:
+    """Changes when the help text, a signature or an alias of a command in the cog changes"""
+    parts = [cog.qualified_name, getattr(cog, "help", "")]
+    for command in sorted(cog.walk_commands(), key=attrgetter("qualified_name")):
+        parts += [
+            command.qualified_name,
+            command.signature,
+            command.help or "",
+            command.hidden,
+            *command.aliases,
+        ]
+    return digest(*parts)
+
+
+def serialize(pages) -> List[dict]:
+    return [
+        page.to_dict() if isinstance(page, discord.Embed) else {"content": page} for page in pages
+    ]
+
+
+def file_name(name: str) -> str:
+    return quote(name, safe="") + ".json"
+
+
+def is_exported(command) -> bool:
+    while command is not None:
+        if command.hidden or not command.enabled:
+            return False
+        command = command.parent
+    return True
+
+
+def read_json(path: Path) -> Optional[Any]:
+    try:
+        with path.open(encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+async def export_help(formatter, ctx, directory: Path, theme: dict) -> Tuple[int, int]:
+    """Renders the help as members see it to JSON files and an index.html in the directory.
+    Returns the number of cogs rendered and skipped as unchanged"""
+    loop = asyncio.get_running_loop()
+    previous = old = await loop.run_in_executor(None, read_json, directory / MANIFEST) or {}
+
+    # Public view, a member in a regular channel with the hidden commands left out
+    ctx = copy(ctx)
+    ctx._chelp_visibility = visibility = Visibility(
+        is_owner=False,
+        is_nsfw=False,
+        nsfw=frozenset(formatter.blacklist_names["nsfw"]),
+        dev=frozenset(formatter.blacklist_names["dev"]),
+    )
+    help_settings = replace(
+        await HelpSettings.from_context(ctx), verify_checks=False, show_hidden=False
+    )
+    base = digest(
+        sorted(theme.items()),
+        formatter.settings["thumbnail"],
+        ctx.clean_prefix,
+        ctx.me.display_name,
+        (await ctx.embed_color()).value,
+        help_settings,
+    )
+    if old.get("base") != base:
+        old = {}  # Everything is rendered again
+
+    async def render(target: str) -> List[dict]:
+        # Export only pages, they'd just push the members' pages out of HELP_CACHE
+        rendered = await formatter.render_pages(ctx, target, help_settings, use_cache=False)
+        return serialize(rendered.get("pages", ()))
+
+    files: Dict[str, Any] = {"home.json": await render("h")}
+    manifest: Dict[str, Any] = {"base": base, "categories": {}, "cogs": {}}
+
+    cog_digests = {}
+    for name, cog in ctx.bot.cogs.items():
+        category = GLOBAL_CATEGORIES.from_cog(name) or GLOBAL_CATEGORIES.uncategorised
+        if visibility.can_see(category.name):
+            # The cog's file names its category, a move has to rewrite it
+            cog_digests[name] = (cog, category.name, digest(category.name, cog_digest(cog)))
+
+    for category in GLOBAL_CATEGORIES:
+        if not visibility.can_see(category.name):
+            continue
+        entry = {
+            "file": "categories/" + file_name(category.name),
+            "digest": digest(
+                category.name,
+                category.desc,
+                category.long_desc,
+                category.thumbnail,
+                category.reaction,
+                *(cog_digests.get(name, (None, None, None))[2] for name in sorted(category.cogs)),
+            ),
+        }
+        manifest["categories"][category.name] = entry
+        if old.get("categories", {}).get(category.name) != entry:
+            pages = await render("k" + category.name)
+            files[entry["file"]] = {"name": category.name, "pages": pages}
+
+    skipped = 0
+    for name, (cog, category_name, cog_hash) in cog_digests.items():
+        entry = {"file": "cogs/" + file_name(name), "digest": cog_hash}
+        manifest["cogs"][name] = entry
+        if old.get("cogs", {}).get(name) == entry:
+            skipped += 1
+            continue
+        commands = {}
+        for command in sorted(cog.walk_commands(), key=attrgetter("qualified_name")):
+            if is_exported(command):
+                commands[command.qualified_name] = await render("m" + command.qualified_name)
+        files[entry["file"]] = {
+            "name": name,
+            "category": category_name,
+            "pages": await render("c" + name),
+            "commands": commands,
+        }
+        # Let the bot breathe between cogs
+        await asyncio.sleep(0)
+
+    await loop.run_in_executor(None, write_bundle, directory, files, manifest, previous)
+    return len(cog_digests) - skipped, skipped
+
+
+def write_bundle(directory: Path, files: Dict[str, Any], manifest: dict, previous: dict):
+    for folder in ("categories", "cogs"):
+        (directory / folder).mkdir(parents=True, exist_ok=True)
+    for path, data in files.items():
+        with (directory / path).open("w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    # Categories and cogs that are gone
+    current = {
+        entry["file"] for group in ("categories", "cogs") for entry in manifest[group].values()
+    }
+    for group in ("categories", "cogs"):
+        for entry in previous.get(group, {}).values():
+            if entry["file"] not in current:
+                (directory / entry["file"]).unlink(missing_ok=True)
+
+    bundle = {
+        path: files[path] if path in files else read_json(directory / path)
+        for path in ["home.json", *sorted(current)]
+    }
+    with (directory / "index.html").open("w", encoding="utf-8") as f:
+        f.write(render_html(bundle))
+    with (directory / MANIFEST).open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+
+
+HTML_HEAD = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Help</title><style>
+body{font-family:sans-serif;background:#313338;color:#dbdee1;max-width:60em;margin:auto}
+.page{background:#2b2d31;border-left:4px solid #5865f2;margin:1em 0;padding:.5em 1em}
+.text{white-space:pre-wrap}h3{margin:.4em 0}a{color:#00a8fc}
+</style></head><body>
+"""
+
+
+def render_page(page: dict) -> str:
+    escape = html.escape
+    if "content" in page:
+        return f'<div class="page text">{escape(page["content"])}</div>'
+    parts = ['<div class="page">']
+    if title := page.get("title"):
+        parts.append(f"<h3>{escape(title)}</h3>")
+    if description := page.get("description"):
+        parts.append(f'<div class="text">{escape(description)}</div>')
+    for field in page.get("fields", ()):
+        parts.append(
+            f'<h4>{escape(field["name"])}</h4><div class="text">{escape(field["value"])}</div>'
+        )
+    parts.append("</div>")
+    return "".join(parts)
+
+
+def render_html(bundle: Dict[str, Any]) -> str:
+    parts = [HTML_HEAD, '<section id="home">']
+    parts += map(render_page, bundle.pop("home.json") or ())
+    parts.append("</section>")
+    for path, data in bundle.items():
+        if not data:
+            continue
+        anchor = html.escape(path[:-5], quote=True)
+        parts.append(f'<section id="{anchor}"><h2>{html.escape(data["name"])}</h2>')
+        parts += map(render_page, data["pages"])
+        for command, pages in data.get("commands", {}).items():
+            parts.append(
+                f'<h3 id="{html.escape(command, quote=True)}">{html.escape(command)}</h3>'
+            )
+            parts += map(render_page, pages)
+        parts.append("</section>")
+    parts.append("</body></html>\n")
+    return "\n".join(parts)
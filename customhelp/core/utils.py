@@ -1,10 +1,22 @@
 # This contains a bunch of utils
 
 
-from typing import Optional
-
+import json
+import logging
+from collections import Counter, defaultdict
+from copy import copy
+from inspect import getfile
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from redbot.core.i18n import get_locale
 from redbot.core.utils.chat_formatting import humanize_timedelta
 
+from . import LINE_CACHE, TAG_CACHE
+
+LOG = logging.getLogger("red.customhelp.core.utils")
+
 # From dpy server >.<
 EMOJI_REGEX = r"<(?P<animated>a?):(?P<name>[a-zA-Z0-9_]{2,32}):(?P<id>[0-9]{18,22})>"
 # https://www.w3resource.com/python-exercises/re/python-re-exercise-42.php
@@ -23,10 +35,45 @@ def emoji_converter(bot, emoji) -> Optional[str]:
 
 
 # Taken from the core help as well :)
-def shorten_line(a_line: str) -> str:
+def shorten_line(a_line: str, suffix: str = "...**") -> str:
     if len(a_line) < 70:  # embed max width needs to be lower
         return a_line
-    return a_line[:67] + "...**"
+    return a_line[:67] + suffix
+
+
+def command_line(
+    ctx, name, command, spacing, fmt="`{name:<{spacing}}:`{doc}", suffix: Optional[str] = "...**"
+) -> str:
+    """Pre-rendered `name: shortdoc` line of a command, shortened unless the suffix is None.
+    Cached per prefix, nickname and locale, the cache is cleared on cog add/remove"""
+    key = (
+        command,
+        name,
+        spacing,
+        fmt,
+        suffix,
+        ctx.clean_prefix,
+        ctx.me.display_name,
+        get_locale(),
+    )
+    if (line := LINE_CACHE.get(key)) is None:
+        line = fmt.format(name=name, spacing=spacing, doc=command.format_shortdoc_for_context(ctx))
+        if suffix is not None:
+            line = shorten_line(line, suffix)
+        LINE_CACHE.set(key, line)
+    return line
+
+
+def requires_key(requires, guild_id: Optional[int]) -> Optional[tuple]:
+    """Commands with the same key pass or fail Requires.verify together.
+    None if the requires have checks or permission rules of their own"""
+    if (
+        requires.checks
+        or requires._global_rules
+        or (guild_id is not None and requires._guild_rules.get(guild_id))
+    ):
+        return None
+    return requires.privilege_level, requires.user_perms, requires.bot_perms
 
 
 # Add permissions
@@ -78,15 +125,115 @@ def get_aliases(command, original):
         return alias
 
 
+async def category_has_commands(formatter, ctx, category, help_settings) -> bool:
+    """Whether the invoker can see any command of the category, with the permission checks.
+    Stops at the first visible command, a cog whose own check fails is skipped at once"""
+    # can_run mutates ctx.command and ctx.permission_state
+    ctx = copy(ctx)
+    groups = [ctx.bot.get_cog(cog_name) for cog_name in category.cogs]
+    if category.is_uncat:
+        # Commands with no cog go into uncategorised
+        groups.append([command for command in ctx.bot.commands if command.cog is None])
+    for group in groups:
+        if not group:
+            continue
+        if isinstance(group, list):
+            cog_commands = group
+        else:
+            cog_commands = group.get_commands()
+            if help_settings.verify_checks and cog_commands:
+                ctx.command = cog_commands[0]
+                if not await group.can_run(ctx):
+                    continue
+        async for __ in formatter.help_filter_func(ctx, cog_commands, help_settings=help_settings):
+            return True
+    return False
+
+
 async def get_category_page_mapper_chunk(
     formatter, get_pages, ctx, cat, help_settings, page_mapping
 ):
-    # Make sure we're not getting the pages (eg: when home button is clicked) else gen category pages
+    # Make sure we're not getting the pages (eg: when home button is clicked) else map the category
+    # The category pages are rendered lazily by HybridMenus.get_pages when they are first opened
     if not get_pages:
-        if cat_page := await formatter.format_category_help(
-            ctx, cat, help_settings=help_settings, get_pages=True
-        ):
-            page_mapping[cat] = cat_page
+        if await category_has_commands(formatter, ctx, cat, help_settings):
+            page_mapping[cat] = None
         else:
             return False
     return True
+
+
+def scan_cog_tags(cog_classes: Dict[str, type]) -> Dict[str, List[str]]:
+    """Tags from the info.json of every cog, blocking so run it in an executor.
+    Parsed files are cached by their mtime"""
+    data = {}
+    for name, cog_class in cog_classes.items():
+        try:
+            info = str(Path(getfile(cog_class)).parent / "info.json")
+            mtime = Path(info).stat().st_mtime_ns
+        except (TypeError, OSError):  # Builtin cogs and cogs without an info.json
+            data[name] = []
+            continue
+
+        cached = TAG_CACHE.get(info)
+        if cached is None or cached[0] != mtime:
+            try:
+                with open(info, "r", encoding="utf-8") as f:
+                    tmp = json.load(f)
+                tags = [i.lower() for i in tmp["tags"]] if "tags" in tmp else []
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                LOG.warning("Invalid JSON in the info.json of cog %s", name)
+                tags = []
+            cached = TAG_CACHE[info] = (mtime, tags)
+        data[name] = cached[1]
+    return data
+
+
+def cluster_cogs(data: Dict[str, List[str]], threshold: float = 0.5) -> Dict[str, List[str]]:
+    """Groups cogs by weighted tag co-occurrence.
+    Tags that show up together in most of their cogs are merged into one group, named after
+    the most popular tag of it. Every cog then joins the group its tags weigh the most in."""
+    popular = Counter(tag for tags in data.values() for tag in set(tags))
+    # Tags used by more than half the cogs (e.g. "utility") would glue every group together
+    stop_count = max(len(data) // 2, 2)
+
+    co_occurrence: Counter = Counter()
+    for tags in data.values():
+        co_occurrence.update(combinations(sorted(set(tags)), 2))
+
+    parent = {tag: tag for tag in popular}
+
+    def find(tag):
+        while parent[tag] != tag:
+            parent[tag] = tag = parent[parent[tag]]
+        return tag
+
+    for (a, b), count in co_occurrence.items():
+        if count < 2 or max(popular[a], popular[b]) > stop_count:
+            continue
+        # Overlap coefficient, how often the rarer tag comes with the other one
+        if count / min(popular[a], popular[b]) >= threshold:
+            parent[find(a)] = find(b)
+
+    cluster_name = {}
+    for tag in sorted(popular, key=lambda tag: (-popular[tag], tag)):
+        cluster_name.setdefault(find(tag), tag)
+
+    groups = defaultdict(set)
+    for cog, tags in data.items():
+        if tags:
+            # The catch-all tags only decide for cogs with nothing else
+            specific = {tag for tag in tags if popular[tag] <= stop_count} or set(tags)
+            weights: Counter = Counter()
+            for tag in specific:
+                weights[cluster_name[find(tag)]] += popular[tag]
+            groups[max(weights, key=lambda name: (weights[name], popular[name]))].add(cog)
+
+    final = {"uncategorised": []}
+    for name, cogs in sorted(groups.items()):
+        if len(cogs) > 1:
+            final[name] = sorted(cogs)
+        else:
+            final["uncategorised"].extend(cogs)
+    final["uncategorised"].sort()
+    return final
@@ -1,11 +1,16 @@
 import enum
 import logging
-from typing import TYPE_CHECKING, List, Optional
+from collections import Counter
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, List, NamedTuple, Optional, Tuple
 
 import discord
 from redbot.core import commands
 
+from . import ARROWS
+
 if TYPE_CHECKING:
+    from .category import Arrow, Category
     import customhelp.core.base_help as base_help
 
 LOG = logging.getLogger("red.customhelp.core.views")
@@ -157,6 +162,29 @@ class ReactButton(discord.ui.Button):
         await self.view.hmenu.category_react_action(self.view.ctx, interaction, self.custom_id)
 
 
+class ArrowButton(discord.ui.Button):
+    view: BaseInteractionMenu
+
+    def __init__(self, name, row=4, **kwargs):
+        self.name = name
+        super().__init__(**kwargs, row=row)
+
+    async def callback(self, interaction):
+        await self.view.hmenu.arrow_emoji_button[self.name](interaction)
+
+
+@lru_cache(maxsize=32)
+def arrow_row(arrows: Tuple["Arrow", ...], single_page: bool) -> Tuple[Tuple[str, dict], ...]:
+    """(name, button kwargs) of the arrow row, computed once per arrow set.
+    A single page only gets the cross"""
+    if single_page:
+        cross = next(arrow for arrow in arrows if arrow.name == "cross")
+        return ((cross.name, {**cross.items(), "row": None}),)
+    return tuple(
+        (arrow.name, {**arrow.items(), "row": 4}) for arrow in arrows if arrow.name != "home"
+    )
+
+
 # Selection Bar
 class SelectMenuHelpBar(discord.ui.Select):
     view: BaseInteractionMenu
@@ -190,3 +218,116 @@ class SelectArrowHelpBar(discord.ui.Select):
             if self.values[0] == "Home":
                 await self.view.hmenu.category_react_action(self.view.ctx, interaction, "home")
             await self.view.hmenu.arrow_emoji_button[self.values[0]](interaction)
+
+
+# PERSISTENT HELP MENUS
+# The whole menu state lives in the custom_ids, so no view is kept per message.
+# Clicks are handled by the on_interaction listener of the cog, which re-renders the pages.
+class MenuState(NamedTuple):
+    author_id: int
+    page: int
+    nav: bool  # Started from the main help, the categories are shown
+    target: str  # See BaguetteHelp.target_id
+
+    def custom_id(self, action: str) -> str:
+        return f"chelp:{action}:{self.author_id}:{self.page}:{int(self.nav)}:{self.target}"
+
+    @classmethod
+    def from_custom_id(cls, custom_id: str) -> Tuple[str, "MenuState"]:
+        _, action, author_id, page, nav, target = custom_id.split(":", 5)
+        return action, cls(int(author_id), int(page), nav == "1", target)
+
+    def fits(self, categories: Iterable["Category"]) -> bool:
+        """custom_ids are limited to 100 characters"""
+        targets = [self.target, *("k" + cat.name for cat in categories)]
+        return all(
+            len(self._replace(target=target, page=999).custom_id("force_right")) <= 100
+            for target in targets
+        )
+
+
+def persistent_view(
+    settings, state: MenuState, categories: List["Category"], single_page: bool
+) -> discord.ui.View:
+    """Same layout as HybridMenus.create_menutype and create_arrowtype, without any callbacks"""
+    view = discord.ui.View(timeout=None)
+    home_id = state._replace(target="h", page=0).custom_id("go")
+
+    if state.nav and categories:
+        if settings["menutype"] == "buttons":
+            for cat in categories:
+                if cat.reaction or cat.label:
+                    view.add_item(
+                        discord.ui.Button(
+                            emoji=cat.reaction,
+                            style=getattr(discord.ButtonStyle, cat.style),
+                            label=cat.label,
+                            custom_id=state._replace(target="k" + cat.name, page=0).custom_id(
+                                "go"
+                            ),
+                        )
+                    )
+        elif settings["menutype"] == "select":
+            options = [
+                discord.SelectOption(
+                    label=cat.name,
+                    description=None if cat.desc == "Not provided" else cat.desc,
+                    emoji=cat.reaction,
+                )
+                for cat in categories
+            ]
+            if settings["arrowtype"] == "buttons":
+                # Home goes in the select bar to save space
+                options.append(
+                    discord.SelectOption(
+                        label="Home", description="Go to the main page", emoji=ARROWS["home"].emoji
+                    )
+                )
+            view.add_item(
+                discord.ui.Select(
+                    placeholder="Select a category...",
+                    options=options,
+                    custom_id=state.custom_id("menu"),
+                    row=0,
+                )
+            )
+
+    if settings["arrowtype"] == "buttons":
+        if state.nav and categories and settings["menutype"] != "select":
+            view.add_item(
+                discord.ui.Button(
+                    emoji=ARROWS["home"].emoji,
+                    style=Counter([arrow.style for arrow in ARROWS]).most_common(1)[0][0],
+                    custom_id=home_id,
+                    row=3 if settings["menutype"] != "buttons" else None,
+                )
+            )
+        if settings["nav"]:
+            for name, kwargs in arrow_row(tuple(ARROWS), single_page):
+                view.add_item(discord.ui.Button(**kwargs, custom_id=state.custom_id(name)))
+    elif settings["arrowtype"] == "select":
+        options = []
+        if settings["nav"]:
+            options = [
+                discord.SelectOption(label=arrow.name, emoji=arrow.emoji)
+                for arrow in ARROWS
+                if arrow.name != "home"
+            ]
+        if state.nav:
+            options.append(
+                discord.SelectOption(
+                    label="Home", description="Return to the main page", emoji=ARROWS["home"].emoji
+                )
+            )
+        if options:
+            view.add_item(
+                discord.ui.Select(
+                    placeholder="Select an arrow...",
+                    options=options,
+                    custom_id=state.custom_id("arrow"),
+                )
+            )
+
+    # A finished view isn't stored by discord.py, the listener handles the clicks instead
+    view.stop()
+    return view
@@ -1,33 +1,44 @@
 ﻿# pyright: reportGeneralTypeIssues=false
 import asyncio
-import json
 import re
-from collections import Counter, defaultdict
-from inspect import getfile
+from collections import defaultdict
 from itertools import chain
-from os import path
-from pathlib import Path
 from types import MethodType
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 import discord
 import yaml
 from redbot.core import Config, commands
 from redbot.core.bot import Red
+from redbot.core.data_manager import cog_data_path
 from redbot.core.i18n import Translator, cog_i18n
 from redbot.core.utils import menus, predicates
 from redbot.core.utils.chat_formatting import box, pagify
 from tabulate import tabulate
 
 from . import themes
-from .core import ARROWS, GLOBAL_CATEGORIES
+from .core import (
+    ARROWS,
+    COMMAND_INDEX,
+    GLOBAL_CATEGORIES,
+    HELP_CACHE,
+    LINE_CACHE,
+    PERMISSION_RULES,
+    SEARCH_INDEX,
+)
 from .core.base_help import EMPTY_STRING, BaguetteHelp
 from .core.category import Arrow, Category, get_category
-from .core.utils import LINK_REGEX, emoji_converter
+from .core.export import export_help
+from .core.utils import LINK_REGEX, cluster_cogs, emoji_converter, scan_cog_tags
 from .core.views import ComponentType, MenuPicker, MenuView
 
 _ = Translator("CustomHelp", __file__)
 
+# Category/blocklist edits are written to config together, once they stop for this long
+SAVE_DELAY = 2
+# But never held back longer than this, when edits keep coming
+SAVE_MAX_DELAY = 10
+
 # Switchable alphabetic ordered display
 # Crowdin stuff ;-;
 # Generating every category page on format_bot_help so as to save time in reaction stuff?
@@ -88,6 +99,7 @@ class CustomHelp(commands.Cog):
                 "menutype": "buttons",  # "emojis","buttons","select","hidden"
                 "arrowtype": "buttons",  # "emojis","buttons","select","hidden"
                 "deletemessage": False,
+                "persistent": False,
             },
             "arrows": [
                 {"name": "force_left", "emoji": "⏮️", "style": "primary", "label": ""},
@@ -101,8 +113,61 @@ class CustomHelp(commands.Cog):
         }
         self.config.register_global(**self.chelp_global)
 
-    def cog_unload(self):
+        # Write-behind for the categories and the blocklist, GLOBAL_CATEGORIES and
+        # self.blacklist are edited first and the config is written by _save_later
+        self.blacklist: Dict[str, List[str]] = {"nsfw": [], "dev": []}
+        self._dirty: Set[str] = set()
+        self._save_at = self._save_deadline = 0.0
+        self._save_task: Optional[asyncio.Task] = None
+
+    async def cog_unload(self):
         self.bot.reset_help_formatter()
+        if self._save_task is not None:
+            self._save_task.cancel()
+        await self.flush_config()
+
+    def schedule_save(self, *groups: str):
+        """Marks "categories"/"blacklist" to be written to config, debounced by SAVE_DELAY"""
+        now = asyncio.get_running_loop().time()
+        if not self._dirty:
+            self._save_deadline = now + SAVE_MAX_DELAY
+        self._dirty.update(groups)
+        self._save_at = min(now + SAVE_DELAY, self._save_deadline)
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_later())
+
+    async def _save_later(self):
+        loop = asyncio.get_running_loop()
+        while (delay := self._save_at - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        await self.flush_config()
+
+    async def flush_config(self):
+        """Writes the pending category/blocklist edits to config, one write per group"""
+        dirty, self._dirty = self._dirty, set()
+        try:
+            if "categories" in dirty:
+                await self.config.categories.set(
+                    [category.to_config() for category in GLOBAL_CATEGORIES]
+                )
+            if "blacklist" in dirty:
+                await self.config.blacklist.set(self.blacklist)
+        except BaseException:
+            self._dirty |= dirty
+            raise
+
+    def update_categories(self):
+        """Call after editing GLOBAL_CATEGORIES in place.
+        Syncs the uncategorised cogs and the indexes, and schedules the config write"""
+        categorised = set(
+            chain.from_iterable(cat.cogs for cat in GLOBAL_CATEGORIES if not cat.is_uncat)
+        )
+        GLOBAL_CATEGORIES.uncategorised.cogs = [
+            cog for cog in self.bot.cogs if cog not in categorised
+        ]
+        GLOBAL_CATEGORIES.reindex()
+        HELP_CACHE.clear()
+        self.schedule_save("categories")
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         """
@@ -131,6 +196,8 @@ class CustomHelp(commands.Cog):
 
     async def refresh_cache(self):
         """Get's the config and re-populates the GLOBAL_CATEGORIES"""
+        await self.flush_config()
+        HELP_CACHE.clear()
         # Just in case if there's no uncategorised category
         await self.add_placeholder_uncategorised()
 
@@ -143,13 +210,12 @@ class CustomHelp(commands.Cog):
             cat_obj.reaction = emoji_converter(self.bot, cat_obj.reaction)
             GLOBAL_CATEGORIES.append(cat_obj)
 
-        # make the uncategorised cogs
-        all_loaded_cogs = set(self.bot.cogs.keys())
-        uncategorised = all_loaded_cogs - set(
-            chain(*(category["cogs"] for category in my_categories))
-        )
+        # make the uncategorised cogs, in the order they were loaded
+        categorised = set(chain(*(category["cogs"] for category in my_categories)))
+        uncategorised = [cog for cog in self.bot.cogs if cog not in categorised]
 
-        GLOBAL_CATEGORIES.uncategorised.cogs = list(uncategorised)
+        GLOBAL_CATEGORIES.uncategorised.cogs = uncategorised
+        GLOBAL_CATEGORIES.reindex()
 
     async def add_placeholder_uncategorised(self):
         # Make sure there's no is_uncat category
@@ -201,15 +267,14 @@ class CustomHelp(commands.Cog):
         # This is needed to be on top so that Cache gets populated no matter what (supplements chelp create)
         await self.refresh_cache()
         await self.refresh_arrows()
+        self.blacklist = await self.config.blacklist()
 
         settings = await self.config.settings()
         if not settings["set_formatter"]:
             return
 
         # Setup the formatter
-        main_theme = BaguetteHelp(
-            self.bot, await self.config.settings(), await self.config.blacklist()
-        )
+        main_theme = BaguetteHelp(self.bot, await self.config.settings(), self.blacklist)
         theme = await self.config.theme()
         if all(theme.values()) is not None:
             for feature in theme:
@@ -224,21 +289,59 @@ class CustomHelp(commands.Cog):
                     )
         self.bot.set_help_formatter(main_theme)
 
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        # Clicks on persistent help menus, no view is listening for them
+        if (
+            interaction.type == discord.InteractionType.component
+            and interaction.data.get("custom_id", "").startswith("chelp:")
+            and isinstance(self.bot._help_formatter, BaguetteHelp)
+        ):
+            await self.bot._help_formatter.handle_interaction(interaction)
+
     @commands.Cog.listener("on_cog_add")
     async def handle_new_cog_entries(self, cog: commands.Cog):
-        cog_name = cog.__class__.__name__
+        HELP_CACHE.clear()
+        LINE_CACHE.clear()
+        PERMISSION_RULES.invalidate()
+        COMMAND_INDEX.invalidate()
+        if cog.qualified_name == "Alias":
+            COMMAND_INDEX.invalidate_aliases()
+        SEARCH_INDEX.add_cog(cog)
+        # Keyed like bot.cogs, which uses qualified_name rather than the class name
+        cog_name = cog.qualified_name
         # GLOBAL_CATEGORIES should be populated by now, cause cog_load is called before this
-        for cat in GLOBAL_CATEGORIES:
-            if cog_name in cat.cogs:
-                break
-        else:
-            GLOBAL_CATEGORIES.uncategorised.cogs.append(cog_name)
-
-    # TODO implement!, careful, people do reload cogs
-    # @commands.Cog.listener("on_cog_remove")
-    # async def handle_cog_remove(self, cog: commands.Cog):
-    #     # cog_name = cog.__class__.__name__
-    #     pass
+        if GLOBAL_CATEGORIES.from_cog(cog_name) is None:
+            GLOBAL_CATEGORIES.add_cog(GLOBAL_CATEGORIES.uncategorised, cog_name)
+
+    @commands.Cog.listener("on_cog_remove")
+    async def handle_cog_remove(self, cog: commands.Cog):
+        HELP_CACHE.clear()
+        LINE_CACHE.clear()
+        PERMISSION_RULES.invalidate()
+        COMMAND_INDEX.invalidate()
+        if cog.qualified_name == "Alias":
+            COMMAND_INDEX.invalidate_aliases()
+        SEARCH_INDEX.remove_cog(cog.qualified_name)
+        # Reloads come back through on_cog_add, which only re-adds uncategorised cogs
+        GLOBAL_CATEGORIES.remove_cog(cog.qualified_name)
+
+    @commands.Cog.listener("on_command_completion")
+    async def handle_alias_edits(self, ctx: commands.Context):
+        # Keep the alias mirror in sync with the alias add/edit/delete commands
+        if ctx.cog is not None and ctx.cog.qualified_name == "Alias":
+            COMMAND_INDEX.invalidate_aliases()
+
+    @commands.Cog.listener("on_command_completion")
+    async def handle_permission_edits(self, ctx: commands.Context):
+        # Rule edits change what everyone can see, they don't dispatch any event of their own
+        cog_name = ctx.cog and ctx.cog.qualified_name
+        if cog_name == "Permissions":
+            PERMISSION_RULES.invalidate()
+            HELP_CACHE.clear()
+        # Same for core's [p]command disable/enable and the rest of its command group
+        elif cog_name == "Core" and ctx.command.qualified_name.startswith("command "):
+            HELP_CACHE.clear()
 
     @commands.is_owner()
     @commands.group()
@@ -250,7 +353,7 @@ class CustomHelp(commands.Cog):
         """Short info about various themes"""
         emb = discord.Embed(color=await ctx.embed_color(), title="All Themes")
         for theme in themes.list:
-            emb.add_field(name=theme, value=themes.list[theme].__doc__, inline=False)
+            emb.add_field(name=theme, value=themes.list.docstring(theme), inline=False)
         await ctx.send(embed=emb)
 
     @chelp.command()
@@ -258,63 +361,53 @@ class CustomHelp(commands.Cog):
         """Force refresh the list of categories, This would reset all the uninstalled/unloaded cogs and will put them into uncategorised."""
         all_cogs = set(self.bot.cogs.keys())
 
-        async with self.config.categories() as my_categories:
-            for category in my_categories:
-                if category.get("is_uncat"):
-                    continue
-                category["cogs"][:] = [cog for cog in category["cogs"] if cog in all_cogs]
+        for category in GLOBAL_CATEGORIES:
+            if not category.is_uncat:
+                category.keep_cogs(all_cogs)
 
-        await self.refresh_cache()
+        self.update_categories()
         await ctx.tick()
 
     @chelp.command()
     async def auto(self, ctx):
         """Auto categorise cogs based on it's tags and display them"""
-        data: Dict[str, List[str]] = {}
-        # Thanks trusty pathlib is awesome.
-        for k, a in self.bot.cogs.items():
-            check = Path(getfile(a.__class__)).parent / "info.json"
-            if path.isfile(check):
-                with open(check, "r", encoding="utf-8") as f:
-                    try:
-                        tmp = json.load(f)
-                        data[k] = [i.lower() for i in tmp["tags"]] if "tags" in tmp else []
-                    except json.JSONDecodeError:
-                        # TODO Implement logger you lazy bum <_<
-                        print(f"[ERROR] Invalid JSON in cog {k}")
-                        data[k] = []
-
-            else:
-                data[k] = []
-
-        # Ofc grouping was done with the help random ppl helping me in pydis guild+stackoverflow :aha:
-        popular = Counter(chain.from_iterable(data.values()))
-        groups = defaultdict(set)
-        for key, tags in data.items():
-            if tags:
-                tag = max(
-                    tags,
-                    key=popular.get,  # type:ignore https://github.com/microsoft/pylance-release/issues/1022
-                )
-                groups[tag].add(key)
-
-        final = {"uncategorised": []}
-        for i, j in groups.items():
-            if len(j) > 1:
-                final[i] = list(j)
-            else:
-                final["uncategorised"].extend(j)
+        # Reading every info.json blocks, do it in a thread. Unchanged files come from the cache
+        cog_classes = {name: cog.__class__ for name, cog in self.bot.cogs.items()}
+        data = await self.bot.loop.run_in_executor(None, scan_cog_tags, cog_classes)
+        final = cluster_cogs(data)
         for i in [
             box(page, lang="yaml")
             for page in pagify(yaml.dump(final), shorten_by=0, page_length=1990)
         ]:
             await ctx.send(i)
 
+    @chelp.command()
+    async def export(self, ctx):
+        """Export the help to JSON files and an index.html, to serve it from a website
+
+        The help is rendered with the current theme as a member would see it, without the hidden commands and the nsfw/dev categories.
+        Only the cogs that changed since the last export are rendered again."""
+        formatter = self.bot._help_formatter
+        if not isinstance(formatter, BaguetteHelp):
+            return await ctx.send(
+                "Custom help isn't in use, "
+                f"enable it with `{ctx.clean_prefix}chelp toggle 1` first"
+            )
+        directory = cog_data_path(self) / "export"
+        async with ctx.typing():
+            rendered, skipped = await export_help(
+                formatter, ctx, directory, await self.config.theme()
+            )
+        await ctx.send(
+            f"Exported the help to `{directory}`\n"
+            f"{rendered} cogs rendered, {skipped} unchanged since the last export"
+        )
+
     @chelp.command()
     async def show(self, ctx):
         """Show the current help settings"""
         settings = await self.config.settings()
-        blocklist = await self.config.blacklist()
+        blocklist = self.blacklist
         setting_mapping = {
             "set_formatter": "iscustomhelp?",
             "thumbnail": "thumbnail",
@@ -325,6 +418,7 @@ class CustomHelp(commands.Cog):
             "arrowtype": "ArrowType",
             "timeout": "Timeout",
             "deletemessage": "Delete user msg",
+            "persistent": "Persistent",
         }
         other_settings = []
         # url doesnt exist now, that's why the check. sorry guys.
@@ -344,6 +438,13 @@ class CustomHelp(commands.Cog):
             value="\n".join(other_settings),
             inline=False,
         )
+        emb.add_field(
+            name="Cache",
+            value=f"`{'Pages':<15}`: {len(HELP_CACHE)}\n"
+            f"`{'Hit rate':<15}`: {HELP_CACHE.hit_rate:.1%} "
+            f"({HELP_CACHE.hits} hits, {HELP_CACHE.misses} misses)",
+            inline=False,
+        )
 
         # TODO PAGINATE TO DISPLAY
         # emb.add_field(
@@ -417,16 +518,7 @@ class CustomHelp(commands.Cog):
         available_categories = [
             category.name for category in GLOBAL_CATEGORIES if category.is_uncat == False
         ]
-        # Not using cache (GLOBAL_CATEGORIES.uncategorised.cogs) cause cog unloads aren't tracked
-        all_cogs = set(self.bot.cogs.keys())
-        uncategorised = all_cogs - set(
-            chain(
-                *(
-                    GLOBAL_CATEGORIES.get(category_name).cogs
-                    for category_name in available_categories
-                )
-            )
-        )
+        uncategorised = set(GLOBAL_CATEGORIES.uncategorised.cogs)
 
         uncat_name = GLOBAL_CATEGORIES.uncategorised.name
         failed_cogs = []
@@ -456,13 +548,11 @@ class CustomHelp(commands.Cog):
             else:
                 to_config["new"].append(parse_to_config(category))
 
-        # Writing to config
-        async with self.config.categories() as conf_cat:
-            conf_cat.extend(to_config["new"])
-            for category_name, cat_conf in to_config["existing"].items():
-                for config_category in conf_cat:
-                    if config_category["name"] == category_name:
-                        config_category["cogs"].extend(cat_conf)
+        for category_data in to_config["new"]:
+            GLOBAL_CATEGORIES.append(Category(**category_data))
+        for category_name, cogs in to_config["existing"].items():
+            GLOBAL_CATEGORIES.get(category_name).add_cogs(*cogs)
+        self.update_categories()
 
         for page in pagify(
             (
@@ -477,7 +567,6 @@ class CustomHelp(commands.Cog):
             )
         ):
             await ctx.send(page)
-        await self.refresh_cache()
 
     @chelp.command()
     async def edit(self, ctx, *, yaml_txt=None):
@@ -566,11 +655,13 @@ class CustomHelp(commands.Cog):
                 failed.append((("[Not a valid category name]", "Everything"), category_name))
 
         if to_config:
-            async with self.config.categories() as conf_cat:
-                for category_name in to_config.keys():
-                    for category_config in conf_cat:
-                        if category_config["name"] == category_name:
-                            category_config.update(to_config[category_name])
+            for category_name, edits in to_config.items():
+                category = GLOBAL_CATEGORIES.find(category_name) or GLOBAL_CATEGORIES.uncategorised
+                if "reaction" in edits:
+                    edits["reaction"] = emoji_converter(self.bot, edits["reaction"])
+                for key, value in edits.items():
+                    setattr(category, key, value)
+            self.update_categories()
 
         for page in pagify(
             "Successfully added the edits"
@@ -584,32 +675,21 @@ class CustomHelp(commands.Cog):
             )
         ):
             await ctx.send(page)
-        await self.refresh_cache()
 
     # Taken from api listing from core
     @chelp.command()
     async def list(self, ctx):
         """Show the list of categories and the cogs in them"""
-        # TODO maybe its a better option to read from cache than config?
-        available_categories_raw = await self.config.categories()
-        all_cogs = set(self.bot.cogs.keys())
-        uncategorised = all_cogs - set(
-            chain(*(category["cogs"] for category in available_categories_raw))
-        )
-        joined = (
-            _("Set Categories:\n") if len(available_categories_raw) > 1 else _("Set Category:\n")
-        )
-        for category in available_categories_raw:
-            if category.get("is_uncat") == True:
+        joined = _("Set Categories:\n") if len(GLOBAL_CATEGORIES) > 1 else _("Set Category:\n")
+        for category in GLOBAL_CATEGORIES:
+            if category.is_uncat:
                 joined += "+ {} (This is where the uncategorised cogs go in):\n".format(
-                    category["name"]
+                    category.name
                 )
-                for cog in sorted(uncategorised):
-                    joined += "  - {}\n".format(cog)
             else:
-                joined += "+ {}:\n".format(category["name"])
-                for cog in sorted(category["cogs"]):
-                    joined += "  - {}\n".format(cog)
+                joined += "+ {}:\n".format(category.name)
+            for cog in sorted(category.cogs):
+                joined += "  - {}\n".format(cog)
 
         for page in pagify(joined, ["\n"], shorten_by=16):
             await ctx.send(box(page.lstrip(" "), lang="diff"))
@@ -632,6 +712,9 @@ class CustomHelp(commands.Cog):
                     self.feature_list[feature],
                     MethodType(inherit_feature, self.bot._help_formatter),
                 )
+                # The cache keys only know the main theme
+                HELP_CACHE.clear()
+                LINE_CACHE.clear()
                 return True
             return False
 
@@ -663,7 +746,7 @@ class CustomHelp(commands.Cog):
         if pred.result is True:
             self.bot.reset_help_formatter()
             self.bot.set_help_formatter(
-                BaguetteHelp(self.bot, await self.config.settings(), await self.config.blacklist())
+                BaguetteHelp(self.bot, await self.config.settings(), self.blacklist)
             )
             await self.config.theme.set(
                 {"cog": None, "category": None, "command": None, "main": None}
@@ -689,6 +772,7 @@ class CustomHelp(commands.Cog):
             return await ctx.send("Timed out, please try again.")
         if msg.content == "y":
             # TODO there must be a better method in getting the defaults. remember?
+            self._dirty.clear()
             await self.config.clear_all()
             self.config.register_global(**self.chelp_global)
             self.bot.reset_help_formatter()
@@ -712,6 +796,8 @@ class CustomHelp(commands.Cog):
                     self.bot._help_formatter,
                 ),
             )
+            HELP_CACHE.clear()
+            LINE_CACHE.clear()
         else:
             await ctx.send(f"Invalid feature: {feature}")
             return
@@ -740,6 +826,7 @@ class CustomHelp(commands.Cog):
             return await ctx.send("Timed out, please try again.")
         if msg.content == "y":
             # TODO there must be a better method in getting the defaults. remember?
+            self._dirty.discard("categories")
             await self.config.categories.clear()
             await ctx.send("Cleared all categories")
             await self.refresh_cache()
@@ -755,10 +842,9 @@ class CustomHelp(commands.Cog):
         invalid = []
         text = ""
         for given_category in category_names:
-            for category in GLOBAL_CATEGORIES:
-                if given_category == category.name and category.is_uncat == False:
-                    to_config.append(category.name)
-                    break
+            category = get_category(given_category)
+            if category is not None and category.is_uncat == False:
+                to_config.append(category.name)
             else:
                 # Uncategorised Name
                 if given_category == GLOBAL_CATEGORIES.uncategorised.name or (
@@ -771,17 +857,13 @@ class CustomHelp(commands.Cog):
                 else:
                     invalid.append(given_category)
 
-        async with self.config.categories() as conf_cat:
-            new_conf_list = []
-            for cat in conf_cat:
-                if cat["name"] not in to_config:
-                    new_conf_list.append(cat)
-            conf_cat[:] = new_conf_list
+        for category_name in to_config:
+            GLOBAL_CATEGORIES.remove(category_name)
+        self.update_categories()
 
         text += _("Sucessfully removed: ") + (", ".join(to_config) + "\n") if to_config else ""
         if invalid:
             text += _("These categories aren't present in the list:\n" + ",".join(invalid))
-        await self.refresh_cache()
         await ctx.send(text)
 
     @remove.command(aliases=["cogs"], require_var_positional=True)
@@ -795,10 +877,8 @@ class CustomHelp(commands.Cog):
         invalid = []
 
         def category_from_cog(cog_name):
-            for category in GLOBAL_CATEGORIES:
-                if cog_name in category.cogs:
-                    return category.name
-            return None
+            category = GLOBAL_CATEGORIES.from_cog(cog_name)
+            return category and category.name
 
         uncat_name = GLOBAL_CATEGORIES.uncategorised.name
         for cog_name in cog_names:
@@ -819,12 +899,10 @@ class CustomHelp(commands.Cog):
                     )
             else:
                 invalid.append(cog_name)
-        async with self.config.categories() as cat_conf:
-            for cat_name, cog_name in to_config:
-                for category in cat_conf:
-                    if cat_name == category["name"]:
-                        category["cogs"].remove(cog_name)
-                        break
+        for cat_name, cog_name in to_config:
+            GLOBAL_CATEGORIES.get(cat_name).remove_cogs(cog_name)
+        if to_config:
+            self.update_categories()
         text = ""
         if to_config:
             text = "Successfully removed the following\n"
@@ -843,7 +921,6 @@ class CustomHelp(commands.Cog):
         if invalid:
             text += "The following cogs are invalid or unloaded:\n" + (", ".join(invalid))
 
-        await self.refresh_cache()
         for page in pagify(text, page_length=1985, shorten_by=0):
             await ctx.send(box(page, lang="yaml"))
 
@@ -922,6 +999,15 @@ class CustomHelp(commands.Cog):
         self._update_conf("settings", "deletemessage", toggle)
         await ctx.send(f"Sucessfully set delete user toggle to {toggle}")
 
+    @chelp_settings.command()
+    async def persistent(self, ctx, toggle: bool):
+        """Use persistent help menus, that keep working after a restart and never time out.
+        The menu state is kept in the buttons, so open menus don't take any memory.
+        Note: This doesn't work with the emojis menutype/arrowtype"""
+        await self.config.settings.persistent.set(toggle)
+        self._update_conf("settings", "persistent", toggle)
+        await ctx.send(f"{'Enabled' if toggle else 'Disabled'} persistent menus")
+
     @chelp_settings.command(aliases=["arrow"])
     async def arrows(self, ctx, *, correct_txt=None):
         """Add custom arrows for fun and profit"""
@@ -1037,13 +1123,14 @@ class CustomHelp(commands.Cog):
                     "This category contains Core cog and shouldn't be hidden under any circumstances"
                 )
             else:
-                async with self.config.blacklist.nsfw() as conf:
-                    if category not in conf:
-                        conf.append(category)
-                        self._update_conf("blacklist_names", "nsfw", conf)
-                        await ctx.send(f"Sucessfully added {category} to nsfw category")
-                    else:
-                        await ctx.send(f"{category} is already present in nsfw blocklist")
+                conf = self.blacklist["nsfw"]
+                if category not in conf:
+                    conf.append(category)
+                    self._update_conf("blacklist_names", "nsfw", conf)
+                    self.schedule_save("blacklist")
+                    await ctx.send(f"Sucessfully added {category} to nsfw category")
+                else:
+                    await ctx.send(f"{category} is already present in nsfw blocklist")
         else:
             await ctx.send("Invalid category name")
 
@@ -1051,16 +1138,17 @@ class CustomHelp(commands.Cog):
     async def remove_nsfw(self, ctx, category: str):
         """Remove categories from the nsfw list"""
         cat_obj = get_category(category) or (
-            category if category in await self.config.blacklist.nsfw() else None
+            category if category in self.blacklist["nsfw"] else None
         )
         if cat_obj:
-            async with self.config.blacklist.nsfw() as conf:
-                if category in conf:
-                    conf.remove(category)
-                    self._update_conf("blacklist_names", "nsfw", conf)
-                    await ctx.send(f"Sucessfully removed {category} from nsfw category")
-                else:
-                    await ctx.send(f"{category} is not present in nsfw blocklist")
+            conf = self.blacklist["nsfw"]
+            if category in conf:
+                conf.remove(category)
+                self._update_conf("blacklist_names", "nsfw", conf)
+                self.schedule_save("blacklist")
+                await ctx.send(f"Sucessfully removed {category} from nsfw category")
+            else:
+                await ctx.send(f"{category} is not present in nsfw blocklist")
         else:
             await ctx.send("Invalid category name")
 
@@ -1077,13 +1165,14 @@ class CustomHelp(commands.Cog):
                     "This category contains Core cog and shouldn't be hidden under any circumstances"
                 )
             else:
-                async with self.config.blacklist.dev() as conf:
-                    if category not in conf:
-                        conf.append(category)
-                        self._update_conf("blacklist_names", "dev", conf)
-                        await ctx.send(f"Sucessfully added {category} to dev list")
-                    else:
-                        await ctx.send(f"{category} is already present in dev list")
+                conf = self.blacklist["dev"]
+                if category not in conf:
+                    conf.append(category)
+                    self._update_conf("blacklist_names", "dev", conf)
+                    self.schedule_save("blacklist")
+                    await ctx.send(f"Sucessfully added {category} to dev list")
+                else:
+                    await ctx.send(f"{category} is already present in dev list")
         else:
             await ctx.send("Invalid category name")
 
@@ -1091,16 +1180,17 @@ class CustomHelp(commands.Cog):
     async def remove_dev(self, ctx, category: str):
         """Remove categories from the dev list"""
         cat_obj = get_category(category) or (
-            category if category in await self.config.blacklist.dev() else None
+            category if category in self.blacklist["dev"] else None
         )
         if cat_obj:
-            async with self.config.blacklist.dev() as conf:
-                if category in conf:
-                    conf.remove(category)
-                    self._update_conf("blacklist_names", "dev", conf)
-                    await ctx.send(f"Sucessfully removed {category} from dev category")
-                else:
-                    await ctx.send(f"{category} is not present in dev list")
+            conf = self.blacklist["dev"]
+            if category in conf:
+                conf.remove(category)
+                self._update_conf("blacklist_names", "dev", conf)
+                self.schedule_save("blacklist")
+                await ctx.send(f"Sucessfully removed {category} from dev category")
+            else:
+                await ctx.send(f"{category} is not present in dev list")
         else:
             await ctx.send("Invalid category name")
 
@@ -1110,7 +1200,7 @@ class CustomHelp(commands.Cog):
         outs = {i: [] for i in themes.list}
         for x in themes.list:
             for y in self.feature_list:
-                if self.feature_list[y] in themes.list[x].__dict__:
+                if self.feature_list[y] in themes.list.features(x):
                     outs[x].append((y, "\N{WHITE HEAVY CHECK MARK}"))
                 else:
                     outs[x].append((y, "❌"))
@@ -1156,16 +1246,8 @@ class CustomHelp(commands.Cog):
             except ValueError:
                 failed.append(cat_name)
 
-        async with self.config.categories() as cat_conf:
-            new_order = [cat_conf[cat_index] for cat_index in to_config]
-
-            for ind in range(len(cat_conf)):
-                if ind not in to_config:
-                    new_order.append(cat_conf[ind])
-
-            cat_conf[:] = new_order
-
-        await self.refresh_cache()
+        GLOBAL_CATEGORIES.move_to_front(to_config)
+        self.update_categories()
         await ctx.send(
             "Sucessfully reordered the categories\n"
             + ("Invalid categories:\n" + "\n".join(failed) if failed else "")
@@ -1178,17 +1260,17 @@ class CustomHelp(commands.Cog):
         if cmd := self.bot.get_command(command):
             em = discord.Embed(title=f"{command}", color=await ctx.embed_color())
             if cmd.cog:
-                cog_name = cmd.cog.__class__.__name__
-                for cat in GLOBAL_CATEGORIES:
-                    if cog_name in cat.cogs:
-                        em.add_field(name="Category:", value=cat.name, inline=False)
-                        em.add_field(name="Cog:", value=cog_name, inline=False)
-                        await ctx.send(embed=em)
-                        break
+                cog_name = cmd.cog.qualified_name
+                if cat := GLOBAL_CATEGORIES.from_cog(cog_name):
+                    em.add_field(name="Category:", value=cat.name, inline=False)
+                    em.add_field(name="Cog:", value=cog_name, inline=False)
+                    await ctx.send(embed=em)
                 else:
                     await ctx.send("Impossible! report this to the cog owner of customhelp pls")
             else:
-                em.add_field(name="Category:", value=GLOBAL_CATEGORIES.category.name, inline=False)
+                em.add_field(
+                    name="Category:", value=GLOBAL_CATEGORIES.uncategorised.name, inline=False
+                )
                 em.add_field(name="Cog:", value="None", inline=False)
                 await ctx.send(embed=em)
         else:
@@ -1200,6 +1282,7 @@ class CustomHelp(commands.Cog):
         key = thumbnail
         value= https://some_url.com"""
 
+        HELP_CACHE.clear()
         # Only change if it's customhelp formatter
         if isinstance(self.bot._help_formatter, BaguetteHelp):
             getattr(self.bot._help_formatter, var)[key] = value
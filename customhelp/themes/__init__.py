@@ -1,17 +1,78 @@
+import ast
 import os
+from collections.abc import Mapping
 from importlib import import_module
 from inspect import isclass
 from pkgutil import iter_modules
+from typing import Dict, List, Optional, Tuple
 
 from ..abc import ThemesMeta
 
-list = {}
+pkg_dir = os.path.dirname(__file__)
+
+
+class ThemeList(Mapping):
+    """Theme name -> theme class. The themes present in this folder are found by name,
+    a theme module is only imported the first time its class is asked for"""
+
+    def __init__(self, directory: str):
+        self._dir = directory
+        self._names = sorted(name for _, name, _ in iter_modules([directory]))
+        self._loaded: Dict[str, type] = {}
+        self._info: Dict[str, Tuple[Optional[str], List[str]]] = {}
+
+    def __getitem__(self, name: str) -> type:
+        if name not in self._loaded:
+            if name not in self._names:
+                raise KeyError(name)
+            theme_module = import_module(f"{__name__}.{name}")
+            for attribute in dir(theme_module):
+                attr = getattr(theme_module, attribute)
+                if isclass(attr) and issubclass(attr, ThemesMeta) and attr is not ThemesMeta:
+                    self._loaded[name] = attr
+                    break
+            else:
+                raise KeyError(name)
+        return self._loaded[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._names
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _read(self, name: str) -> Tuple[Optional[str], List[str]]:
+        """Docstring and features of the theme class, read from the source without importing"""
+        if name not in self._info:
+            if name not in self._names:
+                raise KeyError(name)
+            with open(os.path.join(self._dir, f"{name}.py"), encoding="utf-8") as f:
+                tree = ast.parse(f.read())
+            for node in tree.body:
+                if isinstance(node, ast.ClassDef) and any(
+                    isinstance(base, ast.Name) and base.id == "ThemesMeta" for base in node.bases
+                ):
+                    features = [
+                        item.name
+                        for item in node.body
+                        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+                    ]
+                    self._info[name] = (ast.get_docstring(node, clean=False), features)
+                    break
+            else:
+                self._info[name] = (None, [])
+        return self._info[name]
+
+    def docstring(self, name: str) -> Optional[str]:
+        return self._read(name)[0]
+
+    def features(self, name: str) -> List[str]:
+        """Names of the format_* methods the theme defines"""
+        return self._read(name)[1]
+
 
 # This auto populates the list with the themes present in this folder
-pkg_dir = os.path.dirname(__file__)
-for module_loader, name, ispkg in iter_modules([pkg_dir]):
-    theme_module = import_module(f"{__name__}.{name}")
-    for attribute in dir(theme_module):
-        attr = getattr(theme_module, attribute)
-        if isclass(attr) and issubclass(attr, ThemesMeta) and attr is not ThemesMeta:
-            list[name] = attr
+list = ThemeList(pkg_dir)
@@ -8,6 +8,8 @@ from ..core.base_help import (
     HelpSettings,
     _,
     cast,
+    chunk_lines,
+    command_line,
     commands,
     get_aliases,
     get_cooldowns,
@@ -167,16 +169,11 @@ class DankHelp(ThemesMeta):
 
             if subcommands:
 
-                def shorten_line(a_line: str) -> str:
-                    if len(a_line) < 70:  # embed max width needs to be lower
-                        return a_line
-                    return a_line[:67] + ".."
-
-                subtext = "\n" + "\n".join(
-                    shorten_line(f"`{name:<15}:`{command.format_shortdoc_for_context(ctx)}")
+                subtext = (
+                    command_line(ctx, name, command, 15, suffix="..")
                     for name, command in sorted(subcommands.items())
                 )
-                for i, page in enumerate(pagify(subtext, page_length=500, shorten_by=0)):
+                for i, page in enumerate(chunk_lines(subtext, 500)):
                     if i == 0:
                         title = _("**__Subcommands:__**")
                     else:
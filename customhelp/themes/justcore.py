@@ -10,11 +10,11 @@ from ..core.base_help import (
     HelpSettings,
     _,
     cast,
+    chunk_lines,
+    command_line,
     commands,
     get_cooldowns,
     get_perms,
-    pagify,
-    shorten_line,
 )
 
 
@@ -42,12 +42,12 @@ class JustCore(ThemesMeta):
 
             for cog_name, data in coms:
                 title = f"**__{cog_name}:__**"
-                cog_text = "\n".join(
-                    shorten_line(f"`{name:<15}:` **{command.format_shortdoc_for_context(ctx)}**")
+                cog_text = (
+                    command_line(ctx, name, command, 15, fmt="`{name:<{spacing}}:` **{doc}**")
                     for name, command in sorted(data.items())
                 )
 
-                for i, page in enumerate(pagify(cog_text, page_length=1000, shorten_by=0)):
+                for i, page in enumerate(chunk_lines(cog_text, 1000)):
                     title = title if i < 1 else _("{title} (continued)").format(title=title)
                     field = EmbedField(title, page, False)
                     emb["fields"].append(field)
@@ -75,11 +75,11 @@ class JustCore(ThemesMeta):
             emb = await self.embed_template(help_settings, ctx, obj.format_help_for_context(ctx))
 
             if coms:
-                command_text = "\n".join(
-                    shorten_line(f"`{name:<15}:` **{command.format_shortdoc_for_context(ctx)}**")
+                command_text = (
+                    command_line(ctx, name, command, 15, fmt="`{name:<{spacing}}:` **{doc}**")
                     for name, command in sorted(coms.items())
                 )
-                for i, page in enumerate(pagify(command_text, page_length=500, shorten_by=0)):
+                for i, page in enumerate(chunk_lines(command_text, 500)):
                     if i == 0:
                         title = _("**__Commands:__**")
                     else:
@@ -171,16 +171,11 @@ class JustCore(ThemesMeta):
 
             if subcommands:
 
-                def shorten_line(a_line: str) -> str:
-                    if len(a_line) < 70:  # embed max width needs to be lower
-                        return a_line
-                    return a_line[:67] + "...**"
-
-                subtext = "\n".join(
-                    shorten_line(f"`{name:<15}:` **{command.format_shortdoc_for_context(ctx)}**")
+                subtext = (
+                    command_line(ctx, name, command, 15, fmt="`{name:<{spacing}}:` **{doc}**")
                     for name, command in sorted(subcommands.items())
                 )
-                for i, page in enumerate(pagify(subtext, page_length=500, shorten_by=0)):
+                for i, page in enumerate(chunk_lines(subtext, 500)):
                     if i == 0:
                         title = _("**__Subcommands:__**")
                     else:
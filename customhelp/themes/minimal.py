@@ -7,6 +7,7 @@ from ..core.base_help import (
     _,
     cast,
     chain,
+    command_line,
     commands,
     get_aliases,
     get_cooldowns,
@@ -76,7 +77,9 @@ class MinimalHelp(ThemesMeta):
         spacing = len(max(spacer_list, key=len))
         for cogname, data in coms:
             full_text += "\n".join(
-                f"`{name:<{spacing}}`:{command.format_shortdoc_for_context(ctx)}"
+                command_line(
+                    ctx, name, command, spacing, fmt="`{name:<{spacing}}`:{doc}", suffix=None
+                )
                 for name, command in data.items()
             )
             full_text += "\n"
@@ -100,7 +103,7 @@ class MinimalHelp(ThemesMeta):
 
         spacing = len(max(coms.keys(), key=len))
         full_text += "\n".join(
-            f"`{name:<{spacing}}:`{command.format_shortdoc_for_context(ctx)}"
+            command_line(ctx, name, command, spacing, suffix=None)
             for name, command in sorted(coms.items())
         )
         pages = list(pagify(full_text))
@@ -155,7 +158,9 @@ class MinimalHelp(ThemesMeta):
         if subcommands:
             spacing = len(max(subcommands.keys(), key=len))
             subtext = "\n" + "\n".join(
-                f"`{name:<{spacing}}`:{command.format_shortdoc_for_context(ctx)}"
+                command_line(
+                    ctx, name, command, spacing, fmt="`{name:<{spacing}}`:{doc}", suffix=None
+                )
                 for name, command in sorted(subcommands.items())
             )
             for i, page in enumerate(pagify(subtext, shorten_by=0)):
@@ -8,9 +8,10 @@ from ..core.base_help import (
     HelpSettings,
     _,
     chain,
+    chunk_lines,
+    command_line,
     commands,
     pagify,
-    shorten_line,
     get_category_page_mapper_chunk,
 )
 
@@ -86,11 +87,11 @@ class Mixture(ThemesMeta):
             for cog_name, data in coms:
                 title = f"**__{cog_name}:__**"
 
-                cog_text = "\n" + "\n".join(
-                    shorten_line(f"`{name:<{spacing}}:`{command.format_shortdoc_for_context(ctx)}")
+                cog_text = (
+                    command_line(ctx, name, command, spacing)
                     for name, command in sorted(data.items())
                 )
-                for i, page in enumerate(pagify(cog_text, page_length=1000, shorten_by=0)):
+                for i, page in enumerate(chunk_lines(cog_text, 1000)):
                     title = title if i < 1 else _("{title} (continued)").format(title=title)
                     field = EmbedField(title, page, False)
                     emb["fields"].append(field)
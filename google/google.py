@@ -1,7 +1,8 @@
 import asyncio
+import codecs
 import functools
 import json
-import re
+import os
 from datetime import datetime, timezone
 from textwrap import shorten
 from urllib.parse import quote_plus, urlencode
@@ -9,15 +10,24 @@ from urllib.parse import quote_plus, urlencode
 import aiohttp
 import discord
 from bs4 import BeautifulSoup
-from html2text import html2text as h2t
-from redbot.core import commands
+from redbot.core import Config, commands
 from redbot.core.bot import Red
-from redbot.core.utils.chat_formatting import humanize_number, text_to_file
+from redbot.core.utils.chat_formatting import box, humanize_number, text_to_file
 from redbot.vendored.discord.ext import menus
 
-from .utils import ResultMenu, Source, get_card, get_query, nsfwcheck, s
+from .http_client import close_session, make_session
+from .parser import BS_FEATURES, ResultScanner, parse_images, parse_reverse, parse_text
+from .utils import ParserPool, ResultCache, ResultMenu, Source, get_query, nsfwcheck
 from .yandex import Yandex
 
+# Parsed results of a query are reused for this long
+CACHE_TTL = 600
+CACHE_SIZE = 256
+MAX_WORKERS = 32
+# The results page is read in chunks of this size until enough results are found
+CHUNK_SIZE = 16384
+RESULTS_LIMIT = 10
+
 # TODO Add optional way to use from google search api
 
 
@@ -36,19 +46,26 @@ class Google(Yandex, commands.Cog):
             "accept-language": "en-GB,en-US;q=0.9,en;q=0.8",
             "upgrade-insecure-requests": "1",
             "sec-ch-arch": "x86",
-            "accept-encoding": "gzip, deflate",
             "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9",
             "sec-ch-viewport-width": "1920",
             "sec-ch-bitness": "32",
             
         }
-        self.link_regex = re.compile(
-            r"https?:\/\/(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_\+.~#?&\/\/=]*(?:\.png|\.jpe?g|\.gif))"
-        )
-        self.session = aiohttp.ClientSession()
-
-    def cog_unload(self):
-        asyncio.create_task(self.session.close())
+        self.session: aiohttp.ClientSession = None
+        self.config = Config.get_conf(self, identifier=6712894365, force_registration=True)
+        self.config.register_global(workers=min(4, os.cpu_count() or 1))
+        self.parser_pool: ParserPool = None
+        # Empty results are often a captcha page, those are fetched again
+        self.cache = ResultCache(CACHE_SIZE, CACHE_TTL, keep=lambda result: bool(result[0]))
+
+    async def cog_load(self):
+        self.session = make_session()
+        self.parser_pool = ParserPool(await self.config.workers())
+
+    async def cog_unload(self):
+        if self.parser_pool is not None:
+            self.parser_pool.shutdown()
+        await close_session(self.session)
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         """Thanks Sinbad!"""
@@ -65,7 +82,10 @@ class Google(Yandex, commands.Cog):
 
         isnsfw = nsfwcheck(ctx)
         async with ctx.typing():
-            response, kwargs = await self.get_result(query, nsfw=isnsfw)
+            try:
+                response, kwargs = await self.get_result(query, nsfw=isnsfw)
+            except asyncio.TimeoutError:
+                return await ctx.send("Operation timed out.")
             pages = []
             groups = [response[n : n + 3] for n in range(0, len(response), 3)]
             for num, group in enumerate(groups, 1):
@@ -289,7 +309,10 @@ class Google(Yandex, commands.Cog):
         else:
             isnsfw = nsfwcheck(ctx)
             async with ctx.typing():
-                response, kwargs = await self.get_result(query, images=True, nsfw=isnsfw)
+                try:
+                    response, kwargs = await self.get_result(query, images=True, nsfw=isnsfw)
+                except asyncio.TimeoutError:
+                    return await ctx.send("Operation timed out.")
                 size = len(response)
 
                 class ImgSource(menus.ListPageSource):
@@ -328,14 +351,16 @@ class Google(Yandex, commands.Cog):
         }
 
         async with ctx.typing():
-            async with self.session.get(
-                "https://www.google.com/searchbyimage?" + urlencode(encoded),
-                headers=self.options,
-            ) as resp:
-                text = await resp.read()
-                redir_url = resp.url
-            prep = functools.partial(self.reverse_search, text)
-            result, (response, kwargs) = await self.bot.loop.run_in_executor(None, prep)
+            try:
+                async with self.session.get(
+                    "https://www.google.com/searchbyimage?" + urlencode(encoded),
+                    headers=self.options,
+                ) as resp:
+                    text = await resp.read()
+                    redir_url = resp.url
+            except asyncio.TimeoutError:
+                return await ctx.send("Operation timed out.")
+            result, (response, kwargs) = await self.parser_pool.run(parse_reverse, text)
             pages = []
             if response:
                 groups = [response[n : n + 3] for n in range(0, len(response), 3)]
@@ -377,12 +402,54 @@ class Google(Yandex, commands.Cog):
     async def debug(self, ctx, url: str):
         async with self.session.get(url, headers=self.options) as resp:
             text = await resp.text()
-        raw_html = BeautifulSoup(text, "html.parser")
+        raw_html = BeautifulSoup(text, BS_FEATURES)
         data = raw_html.prettify()
         await ctx.send(file=text_to_file(data, filename="google_debug.html"))
 
+    @commands.is_owner()
+    @commands.group()
+    async def googleset(self, ctx):
+        """Owner settings and diagnostics of the google cog"""
+
+    @googleset.command()
+    async def stats(self, ctx):
+        """Result cache statistics"""
+        cache, pool = self.cache, self.parser_pool
+        await ctx.send(
+            box(
+                f"Cached queries : {len(cache)}/{cache.maxsize} (ttl {cache.ttl}s)\n"
+                f"Hits           : {cache.hits}\n"
+                f"Misses         : {cache.misses}\n"
+                f"Coalesced      : {cache.coalesced}\n"
+                f"Hit rate       : {cache.hit_rate:.1%}\n"
+                f"Parser pool    : {pool.workers} {pool.kind}\n"
+                f"Parsing        : {pool.running}/{pool.max_pending}\n"
+                f"Queued         : {pool.waiting}",
+                lang="yaml",
+            )
+        )
+
+    @googleset.command()
+    async def workers(self, ctx, workers: int = None):
+        """Set how many processes parse the result pages, shows the current number if not given"""
+        if workers is None:
+            return await ctx.send(
+                f"The result pages are parsed by {self.parser_pool.workers} workers"
+            )
+        if not 1 <= workers <= MAX_WORKERS:
+            return await ctx.send(f"The number of workers should be from 1 to {MAX_WORKERS}")
+        await self.config.workers.set(workers)
+        # New parses go to the new pool, the old one completes those it was handed
+        old_pool, self.parser_pool = self.parser_pool, ParserPool(workers)
+        await ctx.tick()
+        await old_pool.close()
+
     async def get_result(self, query, images=False, nsfw=False):
-        """Fetch the data"""
+        """Fetch the data, or reuse the cached results of the same search"""
+        key = (" ".join(query.lower().split()), images, nsfw)
+        return await self.cache.get(key, functools.partial(self.fetch_result, query, images, nsfw))
+
+    async def fetch_result(self, query, images=False, nsfw=False):
         # TODO make this fetching a little better
         encoded = quote_plus(query, encoding="utf-8", errors="replace")
 
@@ -400,68 +467,31 @@ class Google(Yandex, commands.Cog):
             if images
             else "https://www.google.com/search?q="
         )
+        if not images:
+            return await self.stream_results(url + encoded)
         text, redir = await get_html(url, encoded)
-        prep = functools.partial(self.parser_image if images else self.parser_text, text)
-
-        fin, kwargs = await self.bot.loop.run_in_executor(None, prep)
+        fin, kwargs = await self.parser_pool.run(parse_images, text)
         kwargs["redir"] = redir
         return fin, kwargs
 
-    def reverse_search(self, text):
-        soup = BeautifulSoup(text, features="html.parser")
-        if check := soup.find("div", class_="card-section"):
-            if "The URL doesn't refer" in check.text:
-                return check.text, (None, None)
-        if res := soup.find("input", class_="gLFyf gsfi"):
-            return res["value"], (self.parser_text(text, soup=soup, cards=False) or (None, None))
-
-        return None, (None, None)
-
-    def parser_text(self, text, soup=None, cards: bool = True):
-        """My bad logic for scraping"""
-        if not soup:
-            soup = BeautifulSoup(text, features="html.parser")
-
-        final = []
-        kwargs = {"stats": h2t(str(soup.find("div", id="result-stats")))}
-
-        if cards:
-            get_card(soup, final, kwargs)
-
-        for res in soup.select("div.g.tF2Cxc"):
-            if name := res.find("div", class_="yuRUbf"):
-                url = name.a["href"]
-                if title := name.find("h3", class_=re.compile("LC20lb")):
-                    title = title.text
-                else:
-                    title = url
-            else:
-                url = None
-                title = None
-            if desc := res.select_one("div.Z26q7c>div.VwiC3b"):
-                desc = h2t(desc.text)[:500]
-            else:
-                desc = "Not found"
-            if title:
-                final.append(s(url, title, desc.replace("\n", " ")))
-        return final, kwargs
-
-    def parser_image(self, html):
-        excluded_domains = (
-            "google.com",
-            "gstatic.com",
-        )
-        links = self.link_regex.findall(html)
-        ind = 0
-        count = 0
-        while count <= 10:  # first 10 should be enough for the google icons
-            for remove in excluded_domains:
-                if not links:
-                    return [], {}
-                if remove in links[ind]:
-                    links.pop(ind)
+    async def stream_results(self, url):
+        """Downloads the results page until there are enough results and the rhs column, with
+        the knowledge panel, is read. The rest of it is dropped, the part that was read is
+        parsed in the parser pool"""
+        scanner = ResultScanner(RESULTS_LIMIT)
+        async with self.session.get(url, headers=self.options) as resp:
+            self.cookies = resp.cookies
+            decoder = codecs.getincrementaldecoder(resp.charset or "utf-8")(errors="replace")
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                scanner.feed(decoder.decode(chunk))
+                if scanner.done:
+                    # Closes the connection instead of reading the rest
+                    resp.close()
                     break
             else:
-                ind += 1
-            count += 1
-        return links, {}
+                scanner.feed(decoder.decode(b"", final=True))
+            redir = resp.url
+
+        fin, kwargs = await self.parser_pool.run(parse_text, scanner.page())
+        kwargs["redir"] = redir
+        return fin, kwargs
@@ -0,0 +1,295 @@
+# HTML parsing backends for the results page, the fastest one installed is used:
+# selectolax, else BeautifulSoup with lxml, else BeautifulSoup with the builtin html.parser.
+# Both lxml and selectolax are optional, `pip install selectolax` for the fastest one.
+
+import re
+from typing import List, Optional
+
+from bs4 import BeautifulSoup
+from html2text import html2text as h2t
+
+from .utils import get_card, s
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+
+    BS_FEATURES = "lxml"
+except ImportError:
+    BS_FEATURES = "html.parser"
+
+LINK_REGEX = re.compile(
+    r"https?:\/\/(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_\+.~#?&\/\/=]*(?:\.png|\.jpe?g|\.gif))"
+)
+
+# Extraction rules, the classes and ids of the elements.
+# The backends use them as css selectors, the ResultScanner matches RESULT directly.
+STATS_ID = "result-stats"
+RESULT = ("g", "tF2Cxc")
+# Relative to a result
+RESULT_LINK = ("yuRUbf",)
+RESULT_TITLE = "LC20lb"  # part of the h3 class
+RESULT_DESC = ("Z26q7c", "VwiC3b")  # parent, div
+# The outer div of every card get_card knows of, it only runs if one of them is present
+CARDS = (
+    ("g", "mnr-c", "g-blk"),
+    ("kp-blk", "c2xzTb"),
+    ("tyYmIf",),
+    ("osrp-blk",),
+    ("vk_c",),
+    ("tw-src-ltr",),
+    ("nRbRnb",),
+    ("KIy09e",),
+    ("ayRjaf",),
+    ("sXLaOe",),
+)
+
+
+def div(classes) -> str:
+    return "div." + ".".join(classes)
+
+
+SELECTORS = {
+    "stats": f"div#{STATS_ID}",
+    "result": div(RESULT),
+    "result_link": div(RESULT_LINK),
+    "result_title": f"h3[class*={RESULT_TITLE}]",
+    "result_desc": f"{div(RESULT_DESC[:1])} > {div(RESULT_DESC[1:])}",
+    "cards": ", ".join(map(div, CARDS)),
+}
+
+
+class SoupBackend:
+    def __init__(self, features: str):
+        self.name = f"beautifulsoup ({features})"
+        self.features = features
+
+    def parse(self, text):
+        return BeautifulSoup(text, features=self.features)
+
+    def soup(self, text, tree) -> BeautifulSoup:
+        """Tree for get_card"""
+        return tree
+
+    @staticmethod
+    def select(node, selector):
+        return node.select(selector)
+
+    @staticmethod
+    def select_one(node, selector):
+        return node.select_one(selector)
+
+    @staticmethod
+    def text(node) -> str:
+        return node.text
+
+    @staticmethod
+    def html(node) -> str:
+        return str(node)
+
+    @staticmethod
+    def attr(node, name):
+        return node.get(name)
+
+
+class LexborBackend:
+    name = "selectolax"
+
+    @staticmethod
+    def parse(text):
+        return LexborHTMLParser(text)
+
+    @staticmethod
+    def soup(text, tree) -> BeautifulSoup:
+        # The cards are scraped with BeautifulSoup, they're too many to port.
+        # The scripts and styles are most of the page and no card needs them
+        tree.strip_tags(["script", "style"])
+        return BeautifulSoup((tree.body or tree.root).html, features=BS_FEATURES)
+
+    @staticmethod
+    def select(node, selector):
+        return node.css(selector)
+
+    @staticmethod
+    def select_one(node, selector):
+        return node.css_first(selector)
+
+    @staticmethod
+    def text(node) -> str:
+        return node.text(deep=True)
+
+    @staticmethod
+    def html(node) -> str:
+        return node.html
+
+    @staticmethod
+    def attr(node, name):
+        return node.attributes.get(name)
+
+
+BACKENDS = {"html.parser": SoupBackend("html.parser")}
+if BS_FEATURES == "lxml":
+    BACKENDS["lxml"] = SoupBackend("lxml")
+if LexborHTMLParser is not None:
+    BACKENDS["selectolax"] = LexborBackend()
+# The last one is the fastest
+BACKEND = list(BACKENDS.values())[-1]
+SOUP = BACKENDS.get("lxml", BACKENDS["html.parser"])
+
+
+def extract(text, backend=None, tree=None, cards: bool = True):
+    """Results and card of a results page, tree is an already parsed page of the same backend"""
+    backend = backend or BACKEND
+    if tree is None:
+        tree = backend.parse(text)
+
+    final = []
+    stats = backend.select_one(tree, SELECTORS["stats"])
+    kwargs = {"stats": h2t(backend.html(stats) if stats is not None else "None")}
+
+    if cards and backend.select_one(tree, SELECTORS["cards"]) is not None:
+        get_card(backend.soup(text, tree), final, kwargs)
+
+    for res in backend.select(tree, SELECTORS["result"]):
+        url = title = None
+        if (name := backend.select_one(res, SELECTORS["result_link"])) is not None:
+            if (link := backend.select_one(name, "a")) is not None:
+                url = backend.attr(link, "href")
+            if (title := backend.select_one(name, SELECTORS["result_title"])) is not None:
+                title = backend.text(title)
+            else:
+                title = url
+        if (desc := backend.select_one(res, SELECTORS["result_desc"])) is not None:
+            desc = h2t(backend.text(desc))[:500]
+        else:
+            desc = "Not found"
+        if title:
+            final.append(s(url, title, desc.replace("\n", " ")))
+    return final, kwargs
+
+
+def class_lookahead(name: str) -> str:
+    return rf'(?=[^"]*(?<![\w-]){name}(?![\w-]))'
+
+
+# Div tags, counted to know where the columns below end. Only used to know when to stop
+# downloading, the page itself is parsed by the backends.
+DIV_TAG = re.compile(r"<(/?)div\b([^>]*)>")
+RESULT_CLASS = re.compile(r'\bclass="' + "".join(map(class_lookahead, RESULT)))
+# The results and the rhs column (knowledge panel cards) are both in #rcnt, the rhs after them
+CONTENT_ID = 'id="rcnt"'
+SIDE_ID = 'id="rhs"'
+
+
+class ResultScanner:
+    """Counts the results of a page while it downloads, with a regex so it's cheap enough for
+    the event loop. Once the result after `limit` opened and the rhs column was read (or #rcnt
+    closed without one), `done` is set. page() is then the page cut right before that result,
+    with the rhs column after it, for extract to parse in the pool"""
+
+    # Matches can start in the end of the previous chunk
+    OVERLAP = 1024
+
+    def __init__(self, limit: int = 10):
+        self.limit = limit
+        self.count = 0
+        self.cut: Optional[int] = None
+        self.done = False
+        self._parts: List[str] = []
+        self._size = 0
+        self._tail = ""
+        self._last = -1  # Start of the last handled tag
+        self._depth = 0
+        self._content_depth: Optional[int] = None
+        # Where the rhs column starts and ends, and the depth of its div
+        self._side_start: Optional[int] = None
+        self._side_end: Optional[int] = None
+        self._side_depth: Optional[int] = None
+
+    def feed(self, data: str):
+        if self.done:
+            return
+        window = self._tail + data
+        offset = self._size - len(self._tail)
+        for match in DIV_TAG.finditer(window):
+            position = offset + match.start()
+            if position <= self._last:
+                continue
+            self._last = position
+            if match[1]:
+                self._depth -= 1
+                if self._depth == self._side_depth and self._side_end is None:
+                    self._side_end = offset + match.end()
+                    self.done = self.cut is not None
+                elif self._depth == self._content_depth:
+                    self.done = self.cut is not None
+            else:
+                attributes = match[2]
+                if self.cut is None and RESULT_CLASS.search(attributes):
+                    self.count += 1
+                    if self.count > self.limit:
+                        self.cut = position
+                        self.done = self._side_end is not None
+                elif CONTENT_ID in attributes:
+                    self._content_depth = self._depth
+                elif SIDE_ID in attributes and self._side_start is None:
+                    self._side_start = position
+                    self._side_depth = self._depth
+                self._depth += 1
+            if self.done:
+                break
+        self._parts.append(data)
+        self._size += len(data)
+        self._tail = window[-self.OVERLAP :]
+
+    def page(self) -> str:
+        text = "".join(self._parts)
+        if self.cut is None:
+            return text
+        page = text[: self.cut]
+        if self._side_start is not None and self._side_start > self.cut:
+            page += text[self._side_start : self._side_end]
+        return page
+
+
+# The parsers below run in the parser pool, they need to be module level functions
+
+
+def parse_text(text):
+    return extract(text)
+
+
+def parse_images(html):
+    excluded_domains = (
+        "google.com",
+        "gstatic.com",
+    )
+    links = LINK_REGEX.findall(html)
+    ind = 0
+    count = 0
+    while count <= 10:  # first 10 should be enough for the google icons
+        for remove in excluded_domains:
+            if not links:
+                return [], {}
+            if remove in links[ind]:
+                links.pop(ind)
+                break
+        else:
+            ind += 1
+        count += 1
+    return links, {}
+
+
+def parse_reverse(text):
+    soup = SOUP.parse(text)
+    if check := soup.find("div", class_="card-section"):
+        if "The URL doesn't refer" in check.text:
+            return check.text, (None, None)
+    if res := soup.find("input", class_="gLFyf gsfi"):
+        return res["value"], (extract(text, SOUP, soup, cards=False) or (None, None))
+
+    return None, (None, None)
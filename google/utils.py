@@ -1,15 +1,164 @@
+import asyncio
+import logging
+import multiprocessing
+import os
 import re
+import site
+import sys
 import textwrap
-from collections import namedtuple
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
 
 import discord
 from html2text import html2text as h2t
 from redbot.core.utils.chat_formatting import pagify
 from redbot.vendored.discord.ext import menus
 
+LOG = logging.getLogger("red.google.utils")
+# Folder the cog's package is in, the parser processes import it from there
+COGS_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 nsfwcheck = lambda ctx: (not ctx.guild) or ctx.channel.is_nsfw()
 
-s = namedtuple("searchres", "url title desc")
+s = searchres = namedtuple("searchres", "url title desc")  # pickle finds it by the latter
+
+
+class ResultCache:
+    """LRU cache of search results, which expire after ttl seconds.
+    Lookups of a key that's being fetched wait on that fetch instead of starting another"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600, keep: Callable[[Any], bool] = bool):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.keep = keep  # Results it returns False for aren't cached
+        self._cache: OrderedDict = OrderedDict()  # key -> (expiry, result)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable]):
+        if (entry := self._cache.get(key)) is not None:
+            if entry[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._cache[key]
+
+        if (task := self._inflight.get(key)) is None:
+            self.misses += 1
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._store, key))
+        else:
+            self.coalesced += 1
+        # A cancelled caller doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    def _store(self, key: Hashable, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None or not self.keep(task.result()):
+            return
+        self._cache[key] = (time.monotonic() + self.ttl, task.result())
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        self._cache.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class ParserPool:
+    """Executor of the page parsers, own processes where a forkserver is available, else own
+    threads. At most max_pending parses are handed to it at once, the rest wait their turn"""
+
+    def __init__(self, workers: int, max_pending: Optional[int] = None):
+        self.workers = workers
+        self.max_pending = max_pending or workers * 2
+        self._semaphore = asyncio.Semaphore(self.max_pending)
+        self.waiting = 0
+        self.running = 0
+        # Set when nothing is waiting on or running in the pool
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.kind, self._executor = self._make_executor()
+
+    def _make_executor(self, processes: bool = True) -> Tuple[str, Executor]:
+        # Forking the running bot would copy its threads' locks, sockets and event loop,
+        # the forkserver forks the workers from a fresh process instead. They import the
+        # parsers by name, from the folder the cog is installed in.
+        if processes and "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=context,
+                initializer=site.addsitedir,
+                initargs=(COGS_PATH,),
+            )
+            return "processes", executor
+        return "threads", ThreadPoolExecutor(self.workers, thread_name_prefix="google_parser")
+
+    async def run(self, func: Callable, *args):
+        self._idle.clear()
+        try:
+            return await self._run(func, *args)
+        finally:
+            if not self.waiting and not self.running:
+                self._idle.set()
+
+    async def _run(self, func: Callable, *args):
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                return await loop.run_in_executor(self._executor, func, *args)
+            except BrokenProcessPool:
+                # A worker died, start over with new ones
+                self._executor.shutdown(wait=False)
+                self.kind, self._executor = self._make_executor()
+                try:
+                    return await loop.run_in_executor(self._executor, func, *args)
+                except BrokenProcessPool:
+                    # They can't even start (e.g. the cog can't be imported), use threads
+                    LOG.exception("The parser processes keep dying, switching to threads")
+                    self._executor.shutdown(wait=False)
+                    self.kind, self._executor = self._make_executor(processes=False)
+                    return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    async def close(self):
+        """Lets the parses handed to the pool complete, then stops its workers.
+        Nothing should be handed to it after this is called"""
+        await self._idle.wait()
+        # Joining the workers blocks
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    def shutdown(self):
+        """Stops the workers right away, the parses that haven't started are dropped"""
+        if sys.version_info >= (3, 9):
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            # cancel_futures is new in 3.9, the queued parses still run there
+            self._executor.shutdown(wait=False)
 
 
 def reply(ctx):
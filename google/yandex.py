@@ -1,3 +1,4 @@
+import asyncio
 import functools
 import json
 import urllib
@@ -6,6 +7,7 @@ import discord
 from bs4 import BeautifulSoup
 from redbot.core import commands
 
+from .parser import BS_FEATURES
 from .utils import get_query
 
 
@@ -50,13 +52,16 @@ class Yandex:
         }
 
         async with ctx.typing():
-            async with self.session.get(
-                "https://yandex.com/images/search?" + urllib.parse.urlencode(encoded),
-                headers=self.options,
-            ) as resp:
-                text = await resp.read()
-                await ctx.send(text)
-                redir_url = resp.url
+            try:
+                async with self.session.get(
+                    "https://yandex.com/images/search?" + urllib.parse.urlencode(encoded),
+                    headers=self.options,
+                ) as resp:
+                    text = await resp.read()
+                    await ctx.send(text)
+                    redir_url = resp.url
+            except asyncio.TimeoutError:
+                return await ctx.send("Operation timed out.")
             prep = functools.partial(self.yandex_reverse_search, text)
             result = await self.bot.loop.run_in_executor(None, prep)
             if result:
@@ -85,7 +90,7 @@ class Yandex:
                 )
 
     def yandex_reverse_search(self, text):
-        soup = BeautifulSoup(text, features="html.parser")
+        soup = BeautifulSoup(text, features=BS_FEATURES)
         if sidebar := soup.find(
             "div",
             class_="cbir-search-by-image-page__section cbir-search-by-image-page__section_name_tags",